@@ -1,14 +1,59 @@
 import json
 import asyncio
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, List, Optional, Callable, Set
 from dataclasses import dataclass, field
 from enum import Enum
-from openai import AsyncOpenAI
+from pydantic import ValidationError
 from app.config import get_settings
 from app.agent.tools import WebScraperTool, LinkedInFinderTool, TechStackDetectorTool, EmailGeneratorTool, LeadScorerTool
+from app.agent.http import SharedHttpClient, get_http_client
+from app.agent.pages import PageFetcher
+from app.agent.llm import llm
+from app.agent.fallbacks import track_fallbacks, record_fallback
+from app.agent.deadline import start_deadline
+from app.metrics import timed, track_timings
+from app.models.schemas import GeneratedEmail, LeadScore
  
 settings = get_settings()
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+# Graph execution: each stage starts as soon as the stages it reads from have finished.
+STAGE_DEPENDENCIES = {
+    "web_scraper": (),
+    "linkedin_finder": (),
+    "tech_detector": (),
+    "pain": ("tech_detector",),
+    "email_generator": ("web_scraper", "linkedin_finder", "tech_detector", "pain"),
+    "lead_scorer": ("tech_detector", "email_generator"),
+}
+
+# Fused generation replaces pain -> email -> score with one structured call.
+FUSED_STAGE_DEPENDENCIES = {
+    "web_scraper": (),
+    "linkedin_finder": (),
+    "tech_detector": (),
+    "generation": ("web_scraper", "linkedin_finder", "tech_detector"),
+}
+
+# AgentContext attribute each stage fills in.
+STAGE_OUTPUTS = {
+    "web_scraper": "scraped_data",
+    "linkedin_finder": "decision_makers",
+    "tech_detector": "tech_stack",
+    "pain": "pain_hypothesis",
+    "email_generator": "generated_email",
+    "lead_scorer": "lead_score",
+}
+
+def infer_domain(company_name: Optional[str]) -> str:
+    if not company_name: return ""
+    cleaned = company_name.strip().lower()
+    if "." in cleaned:
+        return cleaned.replace("https://", "").replace("http://", "").replace("www.", "")
+    return f"{cleaned.replace(' ', '').replace('.', '')}.com"
+
+def resolve_domain(company_name: Optional[str], company_domain: Optional[str]) -> str:
+    return company_domain or infer_domain(company_name)
 
 class AgentState(Enum):
     IDLE = "idle"
@@ -33,31 +78,70 @@ class AgentContext:
     current_step: int = 0
     max_steps: int = 10
     state: AgentState = AgentState.IDLE
+    pages: Optional[PageFetcher] = None
+    fallbacks: List[Dict[str, str]] = field(default_factory=list)
+    timings: Dict[str, Any] = field(default_factory=dict)
+    on_stage: Optional[Callable[[str, Any], None]] = None
+    # Stages whose output came from the stored lead; skipped even when that output is empty.
+    seeded: Set[str] = field(default_factory=set)
 
 class LeadIntelligenceAgent:
-    def __init__(self):
+    def __init__(self, execution_mode: Optional[str] = None, http_client: Optional[SharedHttpClient] = None, generation_mode: Optional[str] = None, reasoning_mode: Optional[str] = None):
+        self.execution_mode = execution_mode or settings.AGENT_EXECUTION_MODE
+        self.generation_mode = generation_mode or settings.AGENT_GENERATION_MODE
+        # none: no reasoning chain; summary: one post-hoc summary call; full: a _think call per step.
+        self.reasoning_mode = reasoning_mode or settings.AGENT_REASONING_MODE
+        self.http_client = http_client = http_client or get_http_client()
         self.tools = {
-            "web_scraper": WebScraperTool(),
+            "web_scraper": WebScraperTool(http_client),
             "linkedin_finder": LinkedInFinderTool(),
-            "tech_detector": TechStackDetectorTool(),
+            "tech_detector": TechStackDetectorTool(http_client),
             "email_generator": EmailGeneratorTool(),
             "lead_scorer": LeadScorerTool()
         }
     
-    async def run(self, company_name: Optional[str], company_domain: Optional[str], icp_persona: str) -> Dict[str, Any]:
+    async def run(self, company_name: Optional[str], company_domain: Optional[str], icp_persona: str, seed: Optional[Dict[str, Any]] = None,
+                  on_stage: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """Research a company. ``seed`` pre-fills AgentContext attributes; stages whose output is seeded are skipped.
+
+        Every tool and LLM call shares the RESEARCH_DEADLINE_SECONDS budget; calls that run out of it fall back.
+        ``on_stage(stage, output)`` is called as each STAGE_OUTPUTS stage completes, seeded ones included.
+        """
         if not company_name and not company_domain:
             return {"status": "error", "error": "company_name or company_domain is required"}
+        start_deadline(settings.RESEARCH_DEADLINE_SECONDS)
+        started = time.perf_counter()
         ctx = AgentContext(
             company_name=company_name or company_domain,
-            company_domain=company_domain or self._infer_domain(company_name),
+            company_domain=self.resolve_domain(company_name, company_domain),
             icp_persona=icp_persona,
-            state=AgentState.THINKING
+            state=AgentState.THINKING,
+            pages=PageFetcher(self.http_client),
+            fallbacks=track_fallbacks(),
+            timings=track_timings(),
+            on_stage=on_stage
         )
+        for attr, value in (seed or {}).items():
+            setattr(ctx, attr, value)
+        ctx.seeded = {stage for stage, attr in STAGE_OUTPUTS.items() if attr in (seed or {})}
+        for stage in STAGE_OUTPUTS:
+            if stage in ctx.seeded:
+                self._emit(ctx, stage)
         
+        if self.execution_mode == "graph":
+            await self._run_graph(ctx)
+        else:
+            await self._run_sequential(ctx)
+        if self.reasoning_mode == "summary":
+            await self._summarize(ctx)
+        ctx.timings["total_seconds"] = round(time.perf_counter() - started, 4)
+        return self._compile_result(ctx)
+    
+    async def _run_sequential(self, ctx: AgentContext):
         while ctx.current_step < ctx.max_steps and ctx.state != AgentState.COMPLETE:
             ctx.current_step += 1
-            thought = await self._think(ctx)
-            ctx.thoughts.append(thought)
+            if self.reasoning_mode == "full":
+                ctx.thoughts.append(await self._think(ctx))
             ctx.state = AgentState.EXECUTING
             action = await self._decide_action(ctx)
             
@@ -71,42 +155,131 @@ class LeadIntelligenceAgent:
             observation = await self._execute_tool(action, ctx)
             ctx.state = AgentState.OBSERVING
             await self._update_context(ctx, action["tool"], observation)
+            self._emit(ctx, action["tool"])
             await asyncio.sleep(0.5)
+    
+    async def _run_graph(self, ctx: AgentContext):
+        tasks: Dict[str, asyncio.Task] = {}
+        # A partial refresh that keeps some generated sections regenerates only the stale ones.
+        fused = self._fused(ctx)
+        dependencies = FUSED_STAGE_DEPENDENCIES if fused else STAGE_DEPENDENCIES
         
-        return self._compile_result(ctx)
+        async def run_stage(name: str):
+            await asyncio.gather(*(tasks[dep] for dep in dependencies[name]))
+            if name in ctx.seeded:
+                return
+            if name == "email_generator" and not ctx.decision_makers:
+                return
+            ctx.current_step += 1
+            ctx.state = AgentState.EXECUTING
+            if self.reasoning_mode == "full":
+                thought, observation = await asyncio.gather(self._think(ctx), self._execute_stage(name, ctx))
+                ctx.thoughts.append(thought)
+            else:
+                observation = await self._execute_stage(name, ctx)
+            await self._update_context(ctx, name, observation)
+            self._emit(ctx, name)
+        
+        for name in dependencies:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        # Count the terminal step like _run_sequential does, so steps_executed matches between modes.
+        ctx.current_step += 1
+        ctx.state = AgentState.COMPLETE
+    
+    async def _execute_stage(self, name: str, ctx: AgentContext):
+        if name == "pain":
+            ctx.pain_hypothesis = await self._generate_pain(ctx)
+            return {"status": "ok"}
+        if name == "generation":
+            await self._generate_fused(ctx)
+            return {"status": "ok"}
+        return await self._execute_tool(self._build_action(ctx, name), ctx)
+    
+    def _emit(self, ctx: AgentContext, stage: str):
+        if ctx.on_stage is None:
+            return
+        for name in ("pain", "email_generator", "lead_scorer") if stage == "generation" else (stage,):
+            if name in STAGE_OUTPUTS and getattr(ctx, STAGE_OUTPUTS[name]):
+                ctx.on_stage(name, getattr(ctx, STAGE_OUTPUTS[name]))
     
-    def _infer_domain(self, company_name: Optional[str]) -> str:
-        if not company_name: return ""
-        cleaned = company_name.strip().lower()
-        if "." in cleaned:
-            return cleaned.replace("https://", "").replace("http://", "").replace("www.", "")
-        return f"{cleaned.replace(' ', '').replace('.', '')}.com"
+    def resolve_domain(self, company_name: Optional[str], company_domain: Optional[str]) -> str:
+        return resolve_domain(company_name, company_domain)
     
+    @timed("think")
     async def _think(self, ctx: AgentContext) -> str:
         context = f"Step {ctx.current_step}: {ctx.company_name} ({ctx.company_domain}). Data: Scraped={bool(ctx.scraped_data)}, DM={len(ctx.decision_makers)}, Tech={len(ctx.tech_stack)}"
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[{"role": "user", "content": f"{context}\nWhat next?"}],
-            max_tokens=150
+        try:
+            return await llm.complete(
+                "think",
+                model=settings.OPENAI_MODEL,
+                messages=[{"role": "user", "content": f"{context}\nWhat next?"}],
+                max_tokens=150
+            )
+        except Exception as e:
+            record_fallback("think", str(e) or e.__class__.__name__)
+            return context
+    
+    @timed("summary")
+    async def _summarize(self, ctx: AgentContext):
+        titles = ", ".join(d.get("title", "") for d in ctx.decision_makers[:3])
+        tech = ", ".join(t["tech"] for t in ctx.tech_stack[:5])
+        prompt = (
+            f"Summarize in 3 sentences the research on {ctx.company_name} ({ctx.company_domain}) for persona {ctx.icp_persona}: "
+            f"site: {ctx.scraped_data.get('raw_content', {}).get('description', '') or 'n/a'}; contacts: {titles or 'none'}; tech: {tech or 'unknown'}; "
+            f"pain: {ctx.pain_hypothesis}; score: {ctx.lead_score.get('quality_score', 'n/a')}."
         )
-        return response.choices[0].message.content
+        try:
+            summary = await llm.complete(
+                "summary", model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
+                temperature=0.3, max_tokens=200
+            )
+            ctx.thoughts = [summary.strip()]
+        except Exception as e:
+            record_fallback("summary", str(e) or e.__class__.__name__)
+    
+    def _pending(self, ctx: AgentContext, stage: str) -> bool:
+        return stage not in ctx.seeded and not getattr(ctx, STAGE_OUTPUTS[stage])
     
     async def _decide_action(self, ctx: AgentContext) -> Dict[str, Any]:
-        if not ctx.scraped_data:
-            return {"tool": "web_scraper", "params": {"domain": ctx.company_domain}}
-        if not ctx.decision_makers:
-            return {"tool": "linkedin_finder", "params": {"company_name": ctx.company_name or ctx.company_domain, "icp_persona": ctx.icp_persona}}
-        if not ctx.tech_stack:
-            return {"tool": "tech_detector", "params": {"domain": ctx.company_domain}}
-        if not ctx.pain_hypothesis:
+        if self._pending(ctx, "web_scraper"):
+            return self._build_action(ctx, "web_scraper")
+        if self._pending(ctx, "linkedin_finder"):
+            return self._build_action(ctx, "linkedin_finder")
+        if self._pending(ctx, "tech_detector"):
+            return self._build_action(ctx, "tech_detector")
+        if self._fused(ctx):
+            await self._generate_fused(ctx)
+            self._emit(ctx, "generation")
+            return {"tool": "observe", "params": {}}
+        if self._pending(ctx, "pain"):
             ctx.pain_hypothesis = await self._generate_pain(ctx)
+            self._emit(ctx, "pain")
             return {"tool": "observe", "params": {}}
-        if not ctx.generated_email and ctx.decision_makers:
-            return {"tool": "email_generator", "params": {"company_data": {"company_name": ctx.company_name, "description": ctx.scraped_data.get("raw_content", {}).get("description", "")}, "decision_maker": ctx.decision_makers[0], "tech_stack": ctx.tech_stack, "pain_hypothesis": ctx.pain_hypothesis}}
-        if not ctx.lead_score:
-            return {"tool": "lead_scorer", "params": {"company_data": {"company_name": ctx.company_name}, "tech_stack": ctx.tech_stack, "email_quality": ctx.generated_email, "icp_match": ctx.icp_persona}}
+        if self._pending(ctx, "email_generator") and ctx.decision_makers:
+            return self._build_action(ctx, "email_generator")
+        if self._pending(ctx, "lead_scorer"):
+            return self._build_action(ctx, "lead_scorer")
         return {"tool": "complete"}
     
+    def _build_action(self, ctx: AgentContext, tool: str) -> Dict[str, Any]:
+        if tool == "web_scraper":
+            return {"tool": tool, "params": {"domain": ctx.company_domain, "pages": ctx.pages}}
+        if tool == "linkedin_finder":
+            return {"tool": tool, "params": {"company_name": ctx.company_name or ctx.company_domain, "icp_persona": ctx.icp_persona}}
+        if tool == "tech_detector":
+            return {"tool": tool, "params": {"domain": ctx.company_domain, "pages": ctx.pages}}
+        if tool == "email_generator":
+            return {"tool": tool, "params": {"company_data": {"company_name": ctx.company_name, "description": ctx.scraped_data.get("raw_content", {}).get("description", "")}, "decision_maker": ctx.decision_makers[0], "tech_stack": ctx.tech_stack, "pain_hypothesis": ctx.pain_hypothesis}}
+        if tool == "lead_scorer":
+            return {"tool": tool, "params": {"company_data": {"company_name": ctx.company_name}, "tech_stack": ctx.tech_stack, "email_quality": ctx.generated_email, "icp_match": ctx.icp_persona,
+                                             "decision_makers": ctx.decision_makers, "scraped_data": ctx.scraped_data}}
+        return {"tool": "error", "params": {}}
+    
     async def _execute_tool(self, action: Dict, ctx: AgentContext):
         if action["tool"] == "observe": return {"status": "ok"}
         tool = self.tools.get(action["tool"])
@@ -130,20 +303,76 @@ class LeadIntelligenceAgent:
         elif tool_name == "email_generator": ctx.generated_email = observation
         elif tool_name == "lead_scorer": ctx.lead_score = observation
     
+    @timed("pain")
     async def _generate_pain(self, ctx: AgentContext) -> str:
         tech = ", ".join([t["tech"] for t in ctx.tech_stack[:3]])
         prompt = f"Generate 2-sentence pain hypothesis for {ctx.company_name} (tech: {tech}, target: {ctx.icp_persona}). Focus on scaling challenges."
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=100
+        try:
+            content = await llm.complete(
+                "pain",
+                model=settings.OPENAI_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=100
+            )
+            return content.strip()
+        except Exception as e:
+            record_fallback("pain", str(e) or e.__class__.__name__)
+            return f"{ctx.company_name} is likely hitting scaling challenges as its {ctx.icp_persona or 'team'} grows."
+    
+    def _fused(self, ctx: AgentContext) -> bool:
+        return self.generation_mode == "fused" and all(self._pending(ctx, stage) for stage in ("pain", "email_generator", "lead_scorer"))
+    
+    @timed("generation")
+    async def _generate_fused(self, ctx: AgentContext):
+        """Generate pain, email and score in one JSON call; any field that fails validation falls back to its own step."""
+        tech = ", ".join([t["tech"] for t in ctx.tech_stack[:5]])
+        decision_maker = ctx.decision_makers[0] if ctx.decision_makers else {}
+        description = ctx.scraped_data.get("raw_content", {}).get("description", "")
+        # A local scorer needs nothing from the model.
+        local_score = settings.LEAD_SCORER_MODE == "local"
+        prompt = (
+            f"Company: {ctx.company_name} ({ctx.company_domain}). Description: {description}. Tech: {tech}. "
+            f"Target persona: {ctx.icp_persona}. Contact: {decision_maker.get('name', 'there')}, {decision_maker.get('title', '')}.\n"
+            "Return JSON with: pain_hypothesis (2 sentences on scaling challenges), "
+            "email {subject, body, personalization_elements (list of strings), cta}"
+            + ("." if local_score else ", score {reply_probability (0-1), quality_score (0-100), reasoning, factors (dict of scores)}.")
         )
-        return response.choices[0].message.content.strip()
+        try:
+            data = json.loads(await llm.complete(
+                "generation", model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
+                temperature=0.7, response_format={"type": "json_object"}
+            ))
+        except Exception as e:
+            record_fallback("generation", str(e) or e.__class__.__name__)
+            data = {}
+        
+        pain = data.get("pain_hypothesis")
+        if isinstance(pain, str) and pain.strip():
+            ctx.pain_hypothesis = pain.strip()
+        else:
+            record_fallback("generation", "pain_hypothesis missing")
+            ctx.pain_hypothesis = await self._generate_pain(ctx)
+        
+        if ctx.decision_makers:
+            try:
+                ctx.generated_email = GeneratedEmail.model_validate(data.get("email")).model_dump()
+            except ValidationError:
+                record_fallback("generation", "email failed validation")
+                ctx.generated_email = await self._execute_tool(self._build_action(ctx, "email_generator"), ctx)
+        
+        if local_score:
+            ctx.lead_score = await self._execute_tool(self._build_action(ctx, "lead_scorer"), ctx)
+            return
+        try:
+            ctx.lead_score = LeadScore.model_validate(data.get("score")).model_dump()
+        except ValidationError:
+            record_fallback("generation", "score failed validation")
+            ctx.lead_score = await self._execute_tool(self._build_action(ctx, "lead_scorer"), ctx)
     
     def _compile_result(self, ctx: AgentContext) -> Dict[str, Any]:
         return {
             "company_name": ctx.company_name, "company_domain": ctx.company_domain, "icp_persona": ctx.icp_persona,
-            "reasoning_chain": ctx.thoughts, "steps_executed": ctx.current_step,
+            "reasoning_chain": ctx.thoughts, "steps_executed": ctx.current_step, "fallbacks": ctx.fallbacks, "timings": ctx.timings,
             "data": {
                 "company_intelligence": ctx.scraped_data, "decision_makers": ctx.decision_makers,
                 "tech_stack": ctx.tech_stack, "pain_hypothesis": ctx.pain_hypothesis,
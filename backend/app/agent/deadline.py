@@ -0,0 +1,43 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Optional
+
+# Loop-clock instant by which the current research run must finish; tasks spawned by the run inherit it.
+_run_deadline: ContextVar[Optional[float]] = ContextVar("run_deadline", default=None)
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    def __init__(self, message: str = "research deadline exceeded"):
+        super().__init__(message)
+
+def start_deadline(seconds: Optional[float]) -> Optional[float]:
+    deadline = asyncio.get_running_loop().time() + seconds if seconds and seconds > 0 else None
+    _run_deadline.set(deadline)
+    return deadline
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current run's budget, or None when the run has no deadline."""
+    deadline = _run_deadline.get()
+    return None if deadline is None else deadline - asyncio.get_running_loop().time()
+
+async def within_deadline(awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Await ``awaitable`` for at most ``timeout`` seconds and never past the run deadline."""
+    left = remaining()
+    if left is not None:
+        if left <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            elif asyncio.isfuture(awaitable):
+                awaitable.cancel()
+            raise DeadlineExceeded()
+        if timeout is None or left < timeout:
+            timeout = left
+        else:
+            left = None
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        if left is not None:
+            raise DeadlineExceeded() from None
+        raise
@@ -0,0 +1,145 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+# Feed size between "have we got everything?" checks.
+_FEED_CHUNK = 16 * 1024
+# Elements whose text is not page copy; matches what BeautifulSoup's stripped_strings leaves out.
+_SKIP_TEXT = {"script", "style", "template"}
+
+class _Collector:
+    """Parser-agnostic sink for start/end/data events that keeps only what WebScraperTool returns."""
+
+    def __init__(self, max_chunks: int):
+        self.max_chunks = max_chunks
+        self.title: Optional[str] = None
+        self.meta: Dict[str, str] = {}
+        self.chunks: List[str] = []
+        self._buffer: List[str] = []
+        self._skip = 0
+        self._in_title = False
+
+    @property
+    def done(self) -> bool:
+        return len(self.chunks) >= self.max_chunks
+
+    def start(self, tag: str, attrs: Dict[str, Optional[str]]) -> None:
+        self.flush()
+        tag = tag.lower()
+        if tag in _SKIP_TEXT:
+            self._skip += 1
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+        elif tag == "meta":
+            key = (attrs.get("name") or attrs.get("property") or "").lower()
+            if key in ("description", "og:title", "og:description") and key not in self.meta:
+                self.meta[key] = attrs.get("content") or ""
+
+    def end(self, tag: str) -> None:
+        self.flush()
+        tag = tag.lower()
+        if tag in _SKIP_TEXT:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = self.title or ""
+
+    def data(self, text: str) -> None:
+        # Parsers may split one text node across several callbacks; it is joined back on the next tag.
+        self._buffer.append(text)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        if self._skip:
+            return
+        if self._in_title:
+            self.title = (self.title or "") + text
+        stripped = text.strip()
+        if stripped and not self.done:
+            self.chunks.append(stripped)
+
+    def result(self) -> Dict[str, Any]:
+        self.flush()
+        content: Dict[str, Any] = {}
+        description = self.meta.get("description", self.meta.get("og:description"))
+        if description is not None:
+            content["description"] = description
+        title = self.title if self.title is not None else self.meta.get("og:title")
+        if title is not None:
+            content["title"] = title
+        content["full_text"] = " ".join(self.chunks[:self.max_chunks])
+        return content
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector: _Collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+class _LxmlTarget:
+    def __init__(self, collector: _Collector):
+        self.collector = collector
+
+    def start(self, tag, attrib):
+        self.collector.start(tag, dict(attrib))
+
+    def end(self, tag):
+        self.collector.end(tag)
+
+    def data(self, data):
+        self.collector.data(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return None
+
+def _make_parser(backend: str, collector: _Collector):
+    if backend == "lxml":
+        from lxml import etree
+        return etree.HTMLParser(target=_LxmlTarget(collector), recover=True, no_network=True)
+    if backend == "html.parser":
+        return _StdlibParser(collector)
+    raise ValueError(f"Unknown SCRAPER_PARSER {backend!r}; expected 'html.parser' or 'lxml'")
+
+def extract_content(body: bytes, encoding: str = "utf-8", backend: Optional[str] = None,
+                    max_chunks: Optional[int] = None) -> Dict[str, Any]:
+    """Pull title, meta description and the first text chunks out of ``body`` without building a tree.
+
+    The body is decoded and fed incrementally; parsing stops once ``max_chunks`` text chunks are collected.
+    og:title / og:description stand in when the page has no <title> or meta description.
+    """
+    collector = _Collector(max_chunks or settings.SCRAPER_MAX_TEXT_CHUNKS)
+    parser = _make_parser(backend or settings.SCRAPER_PARSER, collector)
+    try:
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    view = memoryview(body)
+    for offset in range(0, len(body), _FEED_CHUNK):
+        parser.feed(decoder.decode(view[offset:offset + _FEED_CHUNK]))
+        if collector.done:
+            break
+    else:
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+    return collector.result()
@@ -0,0 +1,17 @@
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from app.metrics import FALLBACKS
+
+# Fallbacks used by the current research run; tasks spawned by the run share the same list.
+_run_fallbacks: ContextVar[Optional[List[Dict[str, str]]]] = ContextVar("run_fallbacks", default=None)
+
+def track_fallbacks() -> List[Dict[str, str]]:
+    fallbacks: List[Dict[str, str]] = []
+    _run_fallbacks.set(fallbacks)
+    return fallbacks
+
+def record_fallback(source: str, reason: str) -> None:
+    FALLBACKS.inc(source=source)
+    fallbacks = _run_fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append({"source": source, "reason": reason})
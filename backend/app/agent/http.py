@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+import httpx
+from app.config import get_settings
+
+_client: "SharedHttpClient | None" = None
+_logger = logging.getLogger("uvicorn.error")
+
+class SharedHttpClient:
+    """Process-wide httpx client with keep-alive pooling and a per-host connection cap."""
+
+    def __init__(self, client: httpx.AsyncClient, max_per_host: int):
+        self._client = client
+        self._max_per_host = max_per_host
+        # host -> (semaphore, requests holding or waiting for it); dropped when the last one finishes.
+        self._host_slots: dict[str, tuple[asyncio.Semaphore, int]] = {}
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[None]:
+        host = urlsplit(url).netloc.lower()
+        slot, users = self._host_slots.get(host) or (asyncio.Semaphore(self._max_per_host), 0)
+        self._host_slots[host] = (slot, users + 1)
+        try:
+            async with slot:
+                yield
+        finally:
+            slot, users = self._host_slots[host]
+            if users == 1:
+                del self._host_slots[host]
+            else:
+                self._host_slots[host] = (slot, users - 1)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        async with self._slot(url):
+            return await self._client.get(url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        async with self._slot(url):
+            async with self._client.stream("GET", url, **kwargs) as resp:
+                yield resp
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+def build_http_client() -> SharedHttpClient:
+    settings = get_settings()
+    client = httpx.AsyncClient(
+        http2=settings.HTTP_HTTP2,
+        follow_redirects=True,
+        headers={"User-Agent": settings.HTTP_USER_AGENT},
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT,
+        ),
+    )
+    return SharedHttpClient(client, settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+
+async def init_http_client() -> None:
+    global _client
+    if _client is None:
+        _client = build_http_client()
+        _logger.info("HTTP client pool ready (http2=%s)", get_settings().HTTP_HTTP2)
+
+def get_http_client() -> SharedHttpClient:
+    global _client
+    if _client is None:
+        # Scripts and workers that skip the FastAPI lifespan still get a pooled client.
+        _client = build_http_client()
+    return _client
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import random
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from openai import AsyncOpenAI, RateLimitError
+from app.config import get_settings
+from app.models.database import get_db
+from app.agent.deadline import within_deadline
+from app.metrics import LLM_CACHE, LLM_QUEUE_SECONDS, observe_llm
+
+settings = get_settings()
+_logger = logging.getLogger("uvicorn.error")
+
+CACHE_ALWAYS = "always"
+CACHE_LOW_TEMPERATURE = "low_temperature"
+CACHE_NEVER = "never"
+
+# Per-call-site policy; override with LLM_CACHE_POLICIES="tool=policy,...".
+DEFAULT_CACHE_POLICIES = {
+    "think": CACHE_LOW_TEMPERATURE,
+    "pain": CACHE_LOW_TEMPERATURE,
+    "linkedin_finder": CACHE_ALWAYS,
+    "email_generator": CACHE_NEVER,
+    "lead_scorer": CACHE_ALWAYS,
+    "generation": CACHE_NEVER,
+    "summary": CACHE_LOW_TEMPERATURE,
+}
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Lower runs first; batch workers set PRIORITY_BATCH so interactive requests jump the queue.
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+def _parse_policies(raw: str) -> Dict[str, str]:
+    policies = dict(DEFAULT_CACHE_POLICIES)
+    for item in raw.split(","):
+        if "=" in item:
+            tool, policy = item.split("=", 1)
+            policies[tool.strip()] = policy.strip()
+    return policies
+
+class CompletionCache:
+    """Two-tier completion cache: an in-process LRU in front of a Mongo collection with a TTL index."""
+
+    def __init__(self, ttl: float, max_entries: int, collection_name: str = "llm_cache"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.collection_name = collection_name
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], temperature: Optional[float], max_tokens: Optional[int], response_format: Optional[Dict[str, Any]]) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens, "response_format": response_format},
+            sort_keys=True, separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def count(self, tool: str, outcome: str) -> None:
+        counters = self.stats.setdefault(tool, {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "bypassed": 0})
+        counters[outcome] += 1
+        LLM_CACHE.inc(tool=tool, outcome=outcome)
+
+    async def get(self, key: str) -> Optional[tuple[str, str]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, content = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                return content, "memory_hits"
+            del self._memory[key]
+        collection = self._collection()
+        if collection is None:
+            return None
+        try:
+            doc = await collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        except Exception:
+            _logger.warning("LLM cache lookup failed", exc_info=True)
+            return None
+        if not doc:
+            return None
+        self._remember(key, doc["content"], doc["expires_at"].timestamp() - datetime.utcnow().timestamp() + time.time())
+        return doc["content"], "mongo_hits"
+
+    async def put(self, key: str, tool: str, model: str, content: str) -> None:
+        self._remember(key, content, time.time() + self.ttl)
+        collection = self._collection()
+        if collection is None:
+            return
+        now = datetime.utcnow()
+        try:
+            await collection.replace_one(
+                {"_id": key},
+                {"tool": tool, "model": model, "content": content, "created_at": now, "expires_at": now + timedelta(seconds=self.ttl)},
+                upsert=True,
+            )
+        except Exception:
+            _logger.warning("LLM cache write failed", exc_info=True)
+
+    def _remember(self, key: str, content: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, content)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _collection(self):
+        try:
+            return get_db()[self.collection_name]
+        except RuntimeError:
+            return None
+
+class RateScheduler:
+    """Priority queue in front of the API with request and token buckets refilled per minute.
+
+    A 429 pauses dispatch until its retry-after and halves the refill rate; successes restore it gradually.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._rate_factor = 1.0
+        self._queue: List[tuple] = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"granted": 0, "throttled": 0, "rate_limited": 0}
+
+    async def acquire(self, tokens: int, priority: int) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._order), min(tokens, self.tokens_per_minute), waiter))
+        self._dispatch()
+        if not waiter.done():
+            self.stats["throttled"] += 1
+        await waiter
+
+    def rate_limited(self, retry_after: float) -> None:
+        self.stats["rate_limited"] += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._rate_factor = max(0.1, self._rate_factor / 2)
+        self._schedule(retry_after)
+
+    def succeeded(self) -> None:
+        self._rate_factor = min(1.0, self._rate_factor + 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "queued": len(self._queue), "rate_factor": round(self._rate_factor, 2)}
+
+    def _refill(self, now: float) -> None:
+        elapsed = (now - self._refilled) * self._rate_factor / 60.0
+        self._refilled = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        while self._queue:
+            _, _, tokens, waiter = self._queue[0]
+            if waiter.done():
+                heapq.heappop(self._queue)
+                continue
+            if now < self._paused_until:
+                return self._schedule(self._paused_until - now)
+            if self._requests < 1 or self._tokens < tokens:
+                request_wait = (1 - self._requests) / self.requests_per_minute
+                token_wait = (tokens - self._tokens) / self.tokens_per_minute
+                return self._schedule(max(request_wait, token_wait, 0) * 60.0 / self._rate_factor)
+            heapq.heappop(self._queue)
+            self._requests -= 1
+            self._tokens -= tokens
+            self.stats["granted"] += 1
+            waiter.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is None and self._queue:
+            self._timer = asyncio.get_running_loop().call_later(max(delay, 0.01), self._on_timer)
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int]) -> int:
+    # Roughly four characters per token, plus the completion budget.
+    prompt = sum(len(str(m.get("content", ""))) for m in messages) // 4 + 4 * len(messages)
+    return prompt + (max_tokens or settings.LLM_DEFAULT_COMPLETION_TOKENS)
+
+def _retry_after(error: RateLimitError, attempt: int) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[header]) * scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    backoff = settings.LLM_BACKOFF_BASE_SECONDS * (2 ** attempt)
+    return min(settings.LLM_BACKOFF_MAX_SECONDS, backoff) * random.uniform(0.8, 1.2)
+
+class LLMClient:
+    """Chat-completion gateway shared by the agent and its tools: caching, rate budgeting and 429 backoff."""
+
+    def __init__(self, client: AsyncOpenAI, cache: CompletionCache, policies: Dict[str, str], scheduler: RateScheduler):
+        self.client = client
+        self.cache = cache
+        self.policies = policies
+        self.scheduler = scheduler
+
+    def _cacheable(self, tool: str, temperature: Optional[float]) -> bool:
+        if not settings.LLM_CACHE_ENABLED:
+            return False
+        policy = self.policies.get(tool, CACHE_NEVER)
+        if policy == CACHE_ALWAYS:
+            return True
+        if policy == CACHE_LOW_TEMPERATURE:
+            # The API default temperature is 1.0.
+            return (1.0 if temperature is None else temperature) <= settings.LLM_CACHE_LOW_TEMPERATURE
+        return False
+
+    async def complete(self, tool: str, *, model: str, messages: List[Dict[str, Any]], temperature: Optional[float] = None,
+                       max_tokens: Optional[int] = None, response_format: Optional[Dict[str, Any]] = None) -> str:
+        # Bounded by the research run's deadline, including time spent queued in the rate scheduler.
+        return await within_deadline(self._complete(tool, model, messages, temperature, max_tokens, response_format))
+
+    async def _complete(self, tool: str, model: str, messages: List[Dict[str, Any]], temperature: Optional[float],
+                        max_tokens: Optional[int], response_format: Optional[Dict[str, Any]]) -> str:
+        cacheable = self._cacheable(tool, temperature)
+        key = None
+        if cacheable:
+            key = self.cache.make_key(model, messages, temperature, max_tokens, response_format)
+            hit = await self.cache.get(key)
+            if hit is not None:
+                self.cache.count(tool, hit[1])
+                return hit[0]
+            self.cache.count(tool, "misses")
+        else:
+            self.cache.count(tool, "bypassed")
+
+        params: Dict[str, Any] = {"model": model, "messages": messages}
+        if temperature is not None: params["temperature"] = temperature
+        if max_tokens is not None: params["max_tokens"] = max_tokens
+        if response_format is not None: params["response_format"] = response_format
+        response = await self._create(tool, params, estimate_tokens(messages, max_tokens))
+        content = response.choices[0].message.content or ""
+
+        if cacheable and content and self._well_formed(content, response_format):
+            await self.cache.put(key, tool, model, content)
+        return content
+
+    async def _create(self, tool: str, params: Dict[str, Any], tokens: int):
+        priority = llm_priority.get()
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            queued = time.perf_counter()
+            await self.scheduler.acquire(tokens, priority)
+            started = time.perf_counter()
+            LLM_QUEUE_SECONDS.observe(started - queued, tool=tool)
+            try:
+                response = await self.client.chat.completions.create(**params)
+            except RateLimitError as e:
+                if attempt == settings.LLM_MAX_RETRIES:
+                    raise
+                delay = _retry_after(e, attempt)
+                _logger.warning("OpenAI rate limited; retrying in %.1fs", delay)
+                self.scheduler.rate_limited(delay)
+                continue
+            self.scheduler.succeeded()
+            observe_llm(tool, params["model"], time.perf_counter() - started, getattr(response, "usage", None))
+            return response
+
+    @staticmethod
+    def _well_formed(content: str, response_format: Optional[Dict[str, Any]]) -> bool:
+        if (response_format or {}).get("type") != "json_object":
+            return True
+        try:
+            json.loads(content)
+            return True
+        except ValueError:
+            return False
+
+llm = LLMClient(
+    # Retries are handled by the gateway so every 429 feeds the shared backoff.
+    AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, max_retries=0),
+    CompletionCache(settings.LLM_CACHE_TTL_SECONDS, settings.LLM_CACHE_MAX_ENTRIES),
+    _parse_policies(settings.LLM_CACHE_POLICIES),
+    RateScheduler(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE),
+)
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import httpx
+from app.config import get_settings
+from app.agent.http import SharedHttpClient
+from app.agent.deadline import within_deadline
+from app.metrics import PAGE_CACHE, observe_fetch
+
+settings = get_settings()
+
+@dataclass
+class PageArtifact:
+    url: str
+    status_code: int
+    final_url: str
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    cookies: List[str] = field(default_factory=list)
+    encoding: str = "utf-8"
+    truncated: bool = False
+    fetched_at: float = field(default_factory=time.monotonic)
+
+class PageCache:
+    """Short-lived LRU of fetched pages, bounded by entry count and total body bytes."""
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, PageArtifact]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, url: str) -> Optional[PageArtifact]:
+        artifact = self._entries.get(url)
+        if artifact is None:
+            return None
+        if time.monotonic() - artifact.fetched_at > self.ttl:
+            self._remove(url)
+            return None
+        self._entries.move_to_end(url)
+        return artifact
+
+    def put(self, url: str, artifact: PageArtifact) -> None:
+        if self.ttl <= 0 or len(artifact.content) > self.max_bytes:
+            return
+        if url in self._entries:
+            self._remove(url)
+        self._entries[url] = artifact
+        self._bytes += len(artifact.content)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, url: str) -> None:
+        artifact = self._entries.pop(url)
+        self._bytes -= len(artifact.content)
+
+async def _read_capped(resp: httpx.Response, max_bytes: int) -> Tuple[bytes, bool]:
+    """Read at most ``max_bytes`` of the decoded body; the rest of the response is never downloaded."""
+    chunks: List[bytes] = []
+    size = 0
+    async for chunk in resp.aiter_bytes():
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes and size >= max_bytes:
+            return b"".join(chunks)[:max_bytes], True
+    return b"".join(chunks), False
+
+page_cache = PageCache(settings.PAGE_CACHE_TTL_SECONDS, settings.PAGE_CACHE_MAX_ENTRIES, settings.PAGE_CACHE_MAX_BYTES)
+
+class PageFetcher:
+    """Per-run page store: every URL is fetched at most once and shared by all tools in the run."""
+
+    def __init__(self, http_client: SharedHttpClient, cache: PageCache = page_cache, max_bytes: int = settings.PAGE_MAX_BYTES,
+                 hedge_delay: float = settings.HTTP_HEDGE_DELAY_SECONDS, homepage_urls: Optional[List[str]] = None):
+        self.http_client = http_client
+        self.homepage_urls = homepage_urls or settings.homepage_url_templates
+        self.cache = cache
+        self.max_bytes = max_bytes
+        self.hedge_delay = hedge_delay
+        self._fetches: Dict[str, asyncio.Future] = {}
+
+    async def homepage(self, domain: str) -> PageArtifact:
+        """First 200 among the SCRAPER_HOMEPAGE_URLS variants (https://, https://www., http://) for ``domain``, bounded by the run deadline."""
+        key = f"homepage:{domain}"
+        fetch = self._fetches.get(key)
+        if fetch is None:
+            urls = [template.format(domain=domain) for template in self.homepage_urls]
+            fetch = self._fetches[key] = asyncio.ensure_future(within_deadline(self._hedged(urls)))
+        # Shielded so one tool giving up does not cancel the fetch for the others.
+        return await asyncio.shield(fetch)
+
+    async def _hedged(self, urls: List[str]) -> PageArtifact:
+        # Variants start hedge_delay apart, or as soon as the previous one fails; the losers are cancelled.
+        queue, running = list(urls), set()
+        fallback: Optional[PageArtifact] = None
+        error: Optional[BaseException] = None
+        try:
+            while queue or running:
+                if queue:
+                    running.add(asyncio.ensure_future(self._load(queue.pop(0))))
+                done, running = await asyncio.wait(running, timeout=self.hedge_delay if queue else None, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif task.result().status_code == 200:
+                        return task.result()
+                    else:
+                        fallback = fallback or task.result()
+        finally:
+            for task in running:
+                task.cancel()
+        if fallback is not None:
+            return fallback
+        raise error or RuntimeError(f"no response from {urls[0]}")
+
+    async def _load(self, url: str) -> PageArtifact:
+        cached = self.cache.get(url)
+        PAGE_CACHE.inc(outcome="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        try:
+            async with self.http_client.stream(url) as resp:
+                content, truncated = await _read_capped(resp, self.max_bytes)
+        except BaseException as e:
+            # Hedged losers end here cancelled.
+            observe_fetch(time.perf_counter() - started, 0, "cancelled" if isinstance(e, asyncio.CancelledError) else "error")
+            raise
+        observe_fetch(time.perf_counter() - started, len(content), f"{resp.status_code // 100}xx")
+        artifact = PageArtifact(
+            url=url,
+            status_code=resp.status_code,
+            final_url=str(resp.url),
+            content=content,
+            headers=dict(resp.headers),
+            cookies=[c.split("=", 1)[0].strip() for c in resp.headers.get_list("set-cookie")],
+            encoding=resp.encoding or "utf-8",
+            truncated=truncated,
+        )
+        if resp.status_code < 500:
+            self.cache.put(url, artifact)
+        return artifact
@@ -0,0 +1,166 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence
+import numpy as np
+from app.config import get_settings
+
+# Column order of the feature matrix; every feature is scaled to 0..1.
+FEATURES = (
+    "tech_breadth",      # detected technologies, saturating at TECH_BREADTH_SATURATION
+    "tech_confidence",   # mean detection confidence
+    "tech_fit",          # category-weighted confidence, saturating at CATEGORY_SATURATION
+    "decision_makers",   # contacts found, saturating at 3
+    "dm_relevance",      # best contact relevance_score
+    "dm_seniority",      # most senior contact
+    "icp_overlap",       # share of persona keywords found in the site, contacts and stack
+    "scrape_success",    # 1 when the homepage was scraped with content, 0.5 when empty, 0 when it failed
+)
+DEFAULT_WEIGHTS = {
+    "tech_breadth": 0.5, "tech_confidence": 0.5, "tech_fit": 1.5, "decision_makers": 0.75,
+    "dm_relevance": 1.0, "dm_seniority": 1.0, "icp_overlap": 2.0, "scrape_success": 0.75,
+}
+# Categories not listed weigh 1.0; override with LEAD_SCORE_CATEGORY_WEIGHTS="Category=weight,...".
+DEFAULT_CATEGORY_WEIGHTS = {
+    "Monitoring": 2.0, "Feature Flags": 2.0, "PaaS": 1.5, "Backend Framework": 1.5, "Backend as a Service": 1.5,
+    "Customer Data Platform": 1.5, "A/B Testing": 1.5, "Product Adoption": 1.5, "Auth": 1.5, "CDN": 1.25,
+    "Consent Management": 0.25, "Fonts": 0.25, "Social": 0.25, "Popups": 0.25, "Website Builder": 0.5,
+}
+TECH_BREADTH_SATURATION = 15.0
+CATEGORY_SATURATION = 8.0
+SENIORITY = (
+    (("c-suite", "chief", "cto", "ceo", "cio", "founder", "president"), 1.0),
+    (("vp", "vice president"), 0.85),
+    (("head", "director"), 0.7),
+    (("principal", "staff", "lead"), 0.55),
+    (("senior", "manager"), 0.45),
+)
+STOPWORDS = frozenset("a an and at by for from in of on or the to with".split())
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+def keywords(text: str) -> set:
+    return {word.strip(".") for word in _WORD.findall(text.lower())} - STOPWORDS - {""}
+
+def seniority(contact: Dict[str, Any]) -> float:
+    text = f"{contact.get('seniority', '')} {contact.get('title', '')}".lower()
+    words = keywords(text)
+    for markers, rank in SENIORITY:
+        if any(marker in words or (" " in marker and marker in text) for marker in markers):
+            return rank
+    return 0.3 if text.strip() else 0.0
+
+def scrape_success(company_intelligence: Dict[str, Any]) -> float:
+    raw_content = company_intelligence.get("raw_content") or {}
+    if company_intelligence.get("error") or not company_intelligence.get("source_url"):
+        return 0.0
+    return 1.0 if raw_content.get("title") or raw_content.get("description") else 0.5
+
+class LocalLeadScorer:
+    """LeadScore for stored leads from the data the agent already gathered, without an LLM call.
+
+    Leads become a feature matrix (FEATURES), the score is the weighted mean of its columns, computed for a whole
+    batch at once. ``factors`` carries the feature values so a score can be traced back to its inputs.
+    """
+
+    def __init__(self, weights: Dict[str, float], category_weights: Dict[str, float], reply_floor: float, reply_ceiling: float):
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown lead score features: {', '.join(sorted(unknown))}")
+        self.weights = np.array([weights.get(name, DEFAULT_WEIGHTS[name]) for name in FEATURES], dtype=np.float64)
+        if self.weights.sum() <= 0:
+            raise ValueError("LEAD_SCORE_WEIGHTS must include a positive weight")
+        self.category_weights = category_weights
+        self.reply_floor = reply_floor
+        self.reply_ceiling = reply_ceiling
+
+    def features(self, leads: Sequence[Dict[str, Any]]) -> np.ndarray:
+        n = len(leads)
+        X = np.zeros((n, len(FEATURES)), dtype=np.float64)
+        # Flatten the per-lead lists, then aggregate them with numpy.
+        tech_rows: List[int] = []
+        tech_categories: List[str] = []
+        tech_confidences: List[float] = []
+        contact_rows: List[int] = []
+        contact_relevance: List[float] = []
+        contact_seniority: List[float] = []
+        for i, lead in enumerate(leads):
+            company_intelligence = lead.get("company_intelligence") or {}
+            raw_content = company_intelligence.get("raw_content") or {}
+            tech_stack = [t for t in lead.get("tech_stack") or [] if (t.get("tech") or t.get("technology")) not in (None, "Unknown")]
+            contacts = lead.get("decision_makers") or []
+            for tech in tech_stack:
+                tech_rows.append(i)
+                tech_categories.append(tech.get("category") or "Other")
+                tech_confidences.append(float(tech.get("confidence", 0.5)))
+            for contact in contacts:
+                contact_rows.append(i)
+                contact_relevance.append(float(contact.get("relevance_score", 0.5)))
+                contact_seniority.append(seniority(contact))
+            wanted = keywords(lead.get("icp_persona") or "")
+            if wanted:
+                found = keywords(" ".join(
+                    [raw_content.get("title") or "", raw_content.get("description") or ""]
+                    + [f"{c.get('title', '')} {c.get('seniority', '')}" for c in contacts]
+                    + [f"{t.get('tech') or t.get('technology') or ''} {t.get('category') or ''}" for t in tech_stack]
+                ))
+                X[i, 6] = len(wanted & found) / len(wanted)
+            X[i, 7] = scrape_success(company_intelligence)
+
+        if tech_rows:
+            rows = np.array(tech_rows)
+            confidences = np.clip(np.array(tech_confidences), 0.0, 1.0)
+            counts = np.bincount(rows, minlength=n)
+            X[:, 0] = np.minimum(counts / TECH_BREADTH_SATURATION, 1.0)
+            X[:, 1] = np.divide(np.bincount(rows, weights=confidences, minlength=n), counts, out=np.zeros(n), where=counts > 0)
+            # Best confidence per (lead, category), then weighted across categories.
+            names, columns = np.unique(np.array(tech_categories), return_inverse=True)
+            by_category = np.zeros((n, len(names)))
+            np.maximum.at(by_category, (rows, columns), confidences)
+            category_weights = np.array([self.category_weights.get(name, 1.0) for name in names])
+            X[:, 2] = np.minimum(by_category @ category_weights / CATEGORY_SATURATION, 1.0)
+        if contact_rows:
+            rows = np.array(contact_rows)
+            X[:, 3] = np.minimum(np.bincount(rows, minlength=n) / 3.0, 1.0)
+            best = np.zeros((2, n))
+            np.maximum.at(best[0], rows, np.clip(np.array(contact_relevance), 0.0, 1.0))
+            np.maximum.at(best[1], rows, np.array(contact_seniority))
+            X[:, 4], X[:, 5] = best
+        return X
+
+    def score_matrix(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        fit = X @ self.weights / self.weights.sum()
+        return {
+            "quality_score": np.round(fit * 100, 1),
+            "reply_probability": np.round(self.reply_floor + (self.reply_ceiling - self.reply_floor) * fit, 3),
+        }
+
+    def score(self, leads: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """LeadScore-shaped dicts for ``leads`` (stored lead documents or the same fields from an agent run)."""
+        if not leads:
+            return []
+        X = self.features(leads)
+        scores = self.score_matrix(X)
+        contributions = X * self.weights
+        order = np.argsort(contributions, axis=1)
+        results = []
+        for i in range(len(leads)):
+            ranked = order[i]
+            strongest = [FEATURES[j] for j in ranked[::-1][:2] if contributions[i, j] > 0]
+            weakest = [FEATURES[j] for j in ranked[:2] if self.weights[j] > 0]
+            results.append({
+                "reply_probability": float(scores["reply_probability"][i]),
+                "quality_score": float(scores["quality_score"][i]),
+                "reasoning": f"Local score from gathered data. Strongest: {', '.join(strongest) or 'none'}; weakest: {', '.join(weakest)}.",
+                "factors": {name: round(float(X[i, j]), 3) for j, name in enumerate(FEATURES)},
+                "scorer": "local",
+            })
+        return results
+
+@lru_cache()
+def get_scorer() -> LocalLeadScorer:
+    settings = get_settings()
+    return LocalLeadScorer(
+        settings.lead_score_weights,
+        {**DEFAULT_CATEGORY_WEIGHTS, **settings.lead_score_category_weights},
+        settings.LEAD_SCORE_REPLY_FLOOR,
+        settings.LEAD_SCORE_REPLY_CEILING,
+    )
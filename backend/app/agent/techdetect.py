@@ -0,0 +1,179 @@
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from app.config import get_settings
+
+DEFAULT_SIGNATURES_PATH = Path(__file__).parent / "data" / "tech_signatures.json"
+
+# Punctuation HTML signatures are anchored on, rarest in typical markup first.
+_ANCHOR_RANK = b"_(@~;:#?!&+$'[-./=\",<> "
+
+# Tags whose attribute value is matched against the dedicated "script" and "meta" signatures.
+_SCRIPT_SRC = rb"<script\b[^>]*?\ssrc\s*=\s*[\"']?([^\"'\s>]+)"
+_META_GENERATOR = (
+    rb"<meta\b[^>]*?\bname\s*=\s*[\"']?generator[\"']?[^>]*?\bcontent\s*=\s*[\"']([^\"']*)"
+    rb"|<meta\b[^>]*?\bcontent\s*=\s*[\"']([^\"']*)[\"'][^>]*?\bname\s*=\s*[\"']?generator"
+)
+
+@dataclass(frozen=True)
+class Signature:
+    tech: str
+    category: str
+    kind: str
+    pattern: str
+    confidence: float
+
+def _trie_pattern(literals: Iterable[bytes]) -> bytes:
+    """Alternation of ``literals`` factored by common prefix, so the regex engine branches once per shared prefix."""
+    trie: Dict[Any, Any] = {}
+    for literal in literals:
+        node = trie
+        for byte in literal:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def build(node: Dict[Any, Any]) -> bytes:
+        branches = [re.escape(bytes([byte])) + build(child) for byte, child in sorted((k, v) for k, v in node.items() if k is not None)]
+        if not branches:
+            return b""
+        body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        return b"(?:" + body + b")?" if None in node else body
+
+    return build(trie)
+
+class _LiteralMatcher:
+    """Case-insensitive multi-literal matcher compiled into a single regex."""
+
+    def __init__(self, signatures: List[Signature]):
+        self.by_literal: Dict[bytes, List[Signature]] = {}
+        for sig in signatures:
+            self.by_literal.setdefault(sig.pattern.lower().encode("utf-8"), []).append(sig)
+        self.pattern = _trie_pattern(self.by_literal) if self.by_literal else None
+        self.regex = re.compile(self.pattern, re.IGNORECASE) if self.pattern else None
+
+    def lookup(self, matched: bytes) -> Iterable[Signature]:
+        # The regex reports the longest literal at a position; shorter literals that prefix it match too.
+        matched = matched.lower()
+        for end in range(1, len(matched) + 1):
+            yield from self.by_literal.get(matched[:end], ())
+
+    def find(self, data: bytes) -> Iterable[Signature]:
+        if self.regex is None:
+            return
+        for match in self.regex.finditer(data):
+            yield from self.lookup(match.group(0))
+
+def _anchor_index(literal: bytes) -> int:
+    # Prefer anchors followed by a few more bytes; a bare trailing "=" would stop the scan on every attribute.
+    ranked = [(len(literal) - i < 3, _ANCHOR_RANK.index(byte), i) for i, byte in enumerate(literal) if byte in _ANCHOR_RANK]
+    if not ranked:
+        raise ValueError(f"HTML signature {literal!r} needs at least one punctuation character to anchor on")
+    return min(ranked)[2]
+
+class _AnchoredMatcher:
+    """HTML signature matcher whose alternatives all start at a punctuation anchor inside the literal.
+
+    Every alternative begins with a caseless byte, so the compiled regex gets a first-byte prefix set and
+    skips straight over letters and digits; the part of the literal before the anchor is checked afterwards.
+    """
+
+    def __init__(self, signatures: List[Signature]):
+        self.by_suffix: Dict[bytes, List[tuple]] = {}
+        for sig in signatures:
+            literal = sig.pattern.lower().encode("utf-8")
+            anchor = _anchor_index(literal)
+            self.by_suffix.setdefault(literal[anchor:], []).append((literal[:anchor], sig))
+        rests: Dict[int, List[bytes]] = {}
+        for suffix in self.by_suffix:
+            rests.setdefault(suffix[0], []).append(suffix[1:])
+        self.branches = [re.escape(bytes([anchor])) + _trie_pattern(tails) for anchor, tails in sorted(rests.items())]
+        self.regex = re.compile(b"|".join(self.branches), re.IGNORECASE) if self.branches else None
+
+    def resolve(self, data: bytes, start: int, matched: bytes) -> Iterable[Signature]:
+        matched = matched.lower()
+        for end in range(1, len(matched) + 1):
+            for prefix, sig in self.by_suffix.get(matched[:end], ()):
+                if not prefix or (start >= len(prefix) and data[start - len(prefix):start].lower() == prefix):
+                    yield sig
+
+    def find(self, data: bytes) -> Iterable[Signature]:
+        if self.regex is None:
+            return
+        for match in self.regex.finditer(data):
+            yield from self.resolve(data, match.start(), match.group(0))
+
+class TechSignatureEngine:
+    """Detects technologies from headers, cookies, meta generator, script src and HTML signatures in one body scan."""
+
+    def __init__(self, technologies: Dict[str, Dict[str, Any]]):
+        grouped: Dict[str, List[Signature]] = {"html": [], "script": [], "meta": []}
+        self.headers: Dict[str, List[Signature]] = {}
+        self.cookies: List[Signature] = []
+        for tech, spec in technologies.items():
+            category, confidence = spec.get("category", "Other"), float(spec.get("confidence", 0.8))
+            for kind in grouped:
+                grouped[kind].extend(Signature(tech, category, kind, p, confidence) for p in spec.get(kind, []))
+            for name, pattern in spec.get("headers", {}).items():
+                self.headers.setdefault(name.lower(), []).append(Signature(tech, category, f"header:{name.lower()}", pattern.lower(), confidence))
+            self.cookies.extend(Signature(tech, category, "cookie", c.lower(), confidence) for c in spec.get("cookies", []))
+        self.html = _AnchoredMatcher(grouped["html"])
+        self.script = _LiteralMatcher(grouped["script"])
+        self.meta = _LiteralMatcher(grouped["meta"])
+        # Kept as one flat alternation: nesting would hide the first-byte prefix set from the regex compiler.
+        self.document = re.compile(b"|".join([_SCRIPT_SRC, _META_GENERATOR] + self.html.branches), re.IGNORECASE)
+        self.signature_count = sum(len(v) for v in grouped.values()) + sum(len(v) for v in self.headers.values()) + len(self.cookies)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "TechSignatureEngine":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def scan(self, body: bytes, headers: Optional[Dict[str, str]] = None, cookies: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        hits: Dict[Signature, str] = {}
+        for name, value in (headers or {}).items():
+            for sig in self.headers.get(name.lower(), ()):
+                if sig.pattern in value.lower():
+                    hits.setdefault(sig, value[:120])
+        for cookie in cookies:
+            cookie = cookie.lower()
+            for sig in self.cookies:
+                if cookie.startswith(sig.pattern):
+                    hits.setdefault(sig, cookie)
+
+        for match in self.document.finditer(body):
+            src, generator = match.group(1), match.group(2) or match.group(3)
+            if src is not None:
+                found = ((self.script, src), (self.html, src))
+            elif generator is not None:
+                found = ((self.meta, generator),)
+            else:
+                for sig in self.html.resolve(body, match.start(), match.group(0)):
+                    hits.setdefault(sig, sig.pattern)
+                continue
+            for matcher, value in found:
+                for sig in matcher.find(value):
+                    hits.setdefault(sig, value[:200].decode("utf-8", "replace"))
+        return self._summarize(hits)
+
+    @staticmethod
+    def _summarize(hits: Dict[Signature, str]) -> List[Dict[str, Any]]:
+        techs: Dict[str, Dict[str, Any]] = {}
+        for sig, matched in hits.items():
+            tech = techs.setdefault(sig.tech, {"tech": sig.tech, "category": sig.category, "confidence": 0.0, "evidence": [], "_miss": 1.0})
+            # Independent signatures reinforce each other: 1 - prod(1 - c).
+            tech["_miss"] *= 1.0 - sig.confidence
+            tech["evidence"].append({"type": sig.kind, "pattern": sig.pattern, "match": matched})
+        result = []
+        for tech in techs.values():
+            tech["confidence"] = round(min(0.99, 1.0 - tech.pop("_miss")), 3)
+            result.append(tech)
+        result.sort(key=lambda t: (-t["confidence"], t["tech"]))
+        return result
+
+@lru_cache()
+def get_engine() -> TechSignatureEngine:
+    path = get_settings().TECH_SIGNATURES_PATH or DEFAULT_SIGNATURES_PATH
+    return TechSignatureEngine.from_file(Path(path))
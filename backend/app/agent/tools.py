@@ -1,50 +1,48 @@
-import httpx
 import json
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
-from openai import AsyncOpenAI
+from typing import List, Dict, Any, Optional
 from app.config import get_settings
+from app.agent.http import SharedHttpClient
+from app.agent.pages import PageFetcher
+from app.agent.extract import extract_content
+from app.agent.techdetect import get_engine
+from app.agent.llm import llm
+from app.agent.scoring import get_scorer
+from app.agent.fallbacks import record_fallback
+from app.metrics import timed
 
 settings = get_settings()
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
  
 class WebScraperTool:
-    async def scrape(self, domain: str) -> Dict[str, Any]:
+    def __init__(self, http_client: SharedHttpClient):
+        self.http_client = http_client
+
+    @timed("web_scraper")
+    async def scrape(self, domain: str, pages: Optional[PageFetcher] = None) -> Dict[str, Any]:
+        pages = pages or PageFetcher(self.http_client)
+        try:
+            page = await pages.homepage(domain)
+        except Exception as e:
+            record_fallback("web_scraper", f"no page fetched for {domain}: {str(e) or e.__class__.__name__}")
+            return {"raw_content": {}, "domain": domain, "source_url": None}
+        if page.status_code != 200:
+            record_fallback("web_scraper", f"no page fetched for {domain}: HTTP {page.status_code}")
+            return {"raw_content": {}, "domain": domain, "source_url": None}
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as http_client:
-                urls_to_try = [f"https://{domain}", f"https://www.{domain}"]
-                content = {}
-                used_url = None
-                for url in urls_to_try:
-                    try:
-                        resp = await http_client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-                        if resp.status_code == 200:
-                            used_url = url
-                            soup = BeautifulSoup(resp.text, "html.parser")
-                            meta = soup.find("meta", {"name": "description"})
-                            if meta:
-                                content["description"] = meta.get("content", "")
-                            title = soup.find("title")
-                            if title:
-                                content["title"] = title.get_text()
-                            texts = soup.stripped_strings
-                            content["full_text"] = " ".join(list(texts)[:500])
-                            break
-                    except Exception:
-                        continue
-                return {"raw_content": content, "domain": domain, "source_url": used_url}
+            return {"raw_content": extract_content(page.content, page.encoding), "domain": domain, "source_url": page.url, "final_url": page.final_url}
         except Exception as e:
+            record_fallback("web_scraper", str(e))
             return {"error": str(e), "domain": domain}
 
 class LinkedInFinderTool:
+    @timed("linkedin_finder")
     async def find_decision_makers(self, company_name: str, icp_persona: str) -> List[Dict[str, Any]]:
         prompt = f"Given company '{company_name}' and target persona '{icp_persona}', generate 3 LinkedIn searches. Return JSON: {{'searches': [{{'title': '...', 'seniority': '...'}}]}}"
         try:
-            response = await client.chat.completions.create(
-                model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
+            content = await llm.complete(
+                "linkedin_finder", model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"}
             )
-            strategy = json.loads(response.choices[0].message.content)
+            strategy = json.loads(content)
             results = []
             for i, s in enumerate(strategy.get("searches", [])):
                 title = s.get("title", "Executive")
@@ -58,49 +56,56 @@ class LinkedInFinderTool:
                     "relevance_score": 0.9 - (i * 0.15)
                 })
             return results
-        except Exception:
+        except Exception as e:
+            record_fallback("linkedin_finder", str(e) or e.__class__.__name__)
             return [{"name": "CTO", "title": "Chief Technology Officer", "company": company_name, "seniority": "c-suite", "relevance_score": 0.95}]
 
 class TechStackDetectorTool:
-    async def detect(self, domain: str) -> List[Dict[str, Any]]:
+    def __init__(self, http_client: SharedHttpClient):
+        self.http_client = http_client
+
+    @timed("tech_detector")
+    async def detect(self, domain: str, pages: Optional[PageFetcher] = None) -> List[Dict[str, Any]]:
+        pages = pages or PageFetcher(self.http_client)
         try:
-            async with httpx.AsyncClient() as http_client:
-                resp = await http_client.get(f"https://{domain}", headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-                html, headers = resp.text.lower(), dict(resp.headers)
-                tech = []
-                server = headers.get("server", "").lower()
-                if "cloudflare" in server: tech.append({"tech": "Cloudflare", "category": "CDN", "confidence": 0.95})
-                if "nginx" in server: tech.append({"tech": "Nginx", "category": "Web Server", "confidence": 0.9})
-                if "react" in html or "data-reactroot" in html: tech.append({"tech": "React", "category": "Frontend", "confidence": 0.85})
-                if "vue" in html: tech.append({"tech": "Vue.js", "category": "Frontend", "confidence": 0.8})
-                if "gtag" in html: tech.append({"tech": "Google Analytics", "category": "Analytics", "confidence": 0.9})
-                return tech
-        except Exception:
+            page = await pages.homepage(domain)
+            return get_engine().scan(page.content, page.headers, page.cookies)
+        except Exception as e:
+            record_fallback("tech_detector", str(e) or e.__class__.__name__)
             return [{"tech": "Unknown", "category": "N/A", "confidence": 0.0}]
 
 class EmailGeneratorTool:
+    @timed("email_generator")
     async def generate(self, company_data: Dict, decision_maker: Dict, tech_stack: List, pain_hypothesis: str) -> Dict:
         tech_list = ", ".join([t["tech"] for t in tech_stack[:5]])
         prompt = f"Generate cold email to {decision_maker.get('name')} at {company_data.get('company_name')}. Tech: {tech_list}. Pain: {pain_hypothesis}. Return JSON with subject, body, personalization_elements, cta."
         try:
-            response = await client.chat.completions.create(
-                model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
+            content = await llm.complete(
+                "email_generator", model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
                 temperature=0.7, response_format={"type": "json_object"}
             )
-            return json.loads(response.choices[0].message.content)
-        except Exception:
+            return json.loads(content)
+        except Exception as e:
+            record_fallback("email_generator", str(e) or e.__class__.__name__)
             return {"subject": f"Quick question about {company_data.get('company_name')}", 
                    "body": f"Hi {decision_maker.get('name', 'there')},\n\n{pain_hypothesis}\n\nWorth a chat?\n\nBest,",
                    "personalization_elements": ["Growth observation"], "cta": "15-min call?"}
 
 class LeadScorerTool:
-    async def score(self, company_data: Dict, tech_stack: List, email_quality: Dict, icp_match: str) -> Dict:
+    @timed("lead_scorer")
+    async def score(self, company_data: Dict, tech_stack: List, email_quality: Dict, icp_match: str,
+                    decision_makers: Optional[List] = None, scraped_data: Optional[Dict] = None) -> Dict:
+        if settings.LEAD_SCORER_MODE == "local":
+            return get_scorer().score([{
+                "icp_persona": icp_match, "tech_stack": tech_stack, "decision_makers": decision_makers or [], "company_intelligence": scraped_data or {},
+            }])[0]
         prompt = f"Score lead for {company_data}. Return JSON with reply_probability (0-1), quality_score (0-100), reasoning, factors (dict of scores)."
         try:
-            response = await client.chat.completions.create(
-                model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
+            content = await llm.complete(
+                "lead_scorer", model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}],
                 temperature=0.3, response_format={"type": "json_object"}
             )
-            return json.loads(response.choices[0].message.content)
-        except Exception:
+            return json.loads(content)
+        except Exception as e:
+            record_fallback("lead_scorer", str(e) or e.__class__.__name__)
             return {"reply_probability": 0.5, "quality_score": 50, "reasoning": "Default", "factors": {}}
@@ -0,0 +1,169 @@
+import asyncio
+import csv
+import io
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+
+from app.config import get_settings
+from app.models.database import get_db
+from app.models.schemas import LeadInput, BatchStatus, BatchItemStatus
+from app.research import LeadWriter
+from app.jobs import execute_research
+from app.dedupe import DuplicateLead
+from app.agent.llm import llm_priority, PRIORITY_BATCH
+
+settings = get_settings()
+_logger = logging.getLogger("uvicorn.error")
+
+class BatchInputError(ValueError):
+    pass
+
+def get_batches_collection():
+    return get_db()["research_batches"]
+
+def parse_csv(data: bytes, default_persona: Optional[str] = None) -> List[LeadInput]:
+    """Read company_name, company_domain and icp_persona columns; icp_persona falls back to ``default_persona``."""
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+    leads = []
+    for line, row in enumerate(reader, start=2):
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+        persona = row.get("icp_persona") or default_persona
+        if not persona:
+            raise BatchInputError(f"Row {line}: icp_persona is required")
+        if not row.get("company_name") and not row.get("company_domain"):
+            raise BatchInputError(f"Row {line}: company_name or company_domain is required")
+        leads.append(LeadInput(company_name=row.get("company_name") or None, company_domain=row.get("company_domain") or None, icp_persona=persona))
+    return leads
+
+class BatchRun:
+    def __init__(self, leads: List[LeadInput], concurrency: int):
+        self.id = str(ObjectId())
+        self.leads = leads
+        self.concurrency = concurrency
+        self.items = [
+            {"index": i, "company_name": lead.company_name, "company_domain": lead.company_domain, "status": "pending"}
+            for i, lead in enumerate(leads)
+        ]
+        self.status = "queued"
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+        self._started = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for item in self.items if item["status"] == status)
+
+    def snapshot(self, include_items: bool = True) -> BatchStatus:
+        completed, failed = self.count("done"), self.count("failed")
+        elapsed = (self.finished_at - self.started_at).total_seconds() if self.finished_at and self.started_at else (
+            time.monotonic() - self._started if self._started else 0.0)
+        return BatchStatus(
+            id=self.id, status=self.status, total=len(self.items),
+            pending=self.count("pending"), running=self.count("running"), completed=completed, failed=failed,
+            concurrency=self.concurrency,
+            throughput_per_minute=round((completed + failed) / elapsed * 60, 2) if elapsed else 0.0,
+            created_at=self.created_at, started_at=self.started_at, finished_at=self.finished_at,
+            items=[BatchItemStatus(**item) for item in self.items] if include_items else [],
+        )
+
+class BatchRunner:
+    """Runs research batches in the background with a process-wide cap on concurrent agents."""
+
+    def __init__(self, concurrency: int, write_size: int, history: int):
+        self.concurrency = concurrency
+        self.write_size = write_size
+        self.history = history
+        self._slots = asyncio.Semaphore(concurrency)
+        self._runs: Dict[str, BatchRun] = {}
+
+    async def submit(self, leads: List[LeadInput], concurrency: Optional[int] = None) -> BatchRun:
+        if not leads:
+            raise BatchInputError("Batch is empty")
+        if len(leads) > settings.BATCH_MAX_ITEMS:
+            raise BatchInputError(f"Batch exceeds {settings.BATCH_MAX_ITEMS} items")
+        run = BatchRun(leads, min(concurrency or self.concurrency, self.concurrency))
+        await self._save(run)
+        self._runs[run.id] = run
+        self._trim()
+        run.task = asyncio.create_task(self._run(run))
+        return run
+
+    async def get(self, batch_id: str) -> Optional[BatchStatus]:
+        run = self._runs.get(batch_id)
+        if run is not None:
+            return run.snapshot()
+        doc = await get_batches_collection().find_one({"_id": batch_id})
+        if not doc:
+            return None
+        doc["id"] = doc.pop("_id")
+        return BatchStatus(**doc)
+
+    async def shutdown(self) -> None:
+        running = [run.task for run in self._runs.values() if run.task and not run.task.done()]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run(self, run: BatchRun) -> None:
+        llm_priority.set(PRIORITY_BATCH)
+        run.status, run.started_at, run._started = "running", datetime.utcnow(), time.monotonic()
+        writer = LeadWriter(self.write_size)
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in run.items:
+            queue.put_nowait(item)
+
+        async def worker():
+            while not queue.empty():
+                item = queue.get_nowait()
+                async with self._slots:
+                    await self._research_item(run, item, writer)
+                if (run.count("done") + run.count("failed")) % self.write_size == 0:
+                    await self._save(run)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(run.concurrency, len(run.items)))]
+        try:
+            await asyncio.gather(*workers)
+            run.status = "complete"
+        except asyncio.CancelledError:
+            run.status = "interrupted"
+            for task in workers:
+                task.cancel()
+            for item in run.items:
+                if item["status"] in ("pending", "running"):
+                    item.update(status="failed", error="Batch interrupted")
+        finally:
+            run.finished_at = datetime.utcnow()
+            try:
+                await writer.flush()
+                await self._save(run)
+            except Exception:
+                _logger.exception("Failed to persist batch %s", run.id)
+
+    async def _research_item(self, run: BatchRun, item: Dict[str, Any], writer: LeadWriter) -> None:
+        item["status"] = "running"
+        started = time.monotonic()
+        try:
+            lead_doc, source = await execute_research(run.leads[item["index"]], writer=writer, priority=PRIORITY_BATCH)
+            item.update(status="done", lead_id=str(lead_doc["_id"]), research_source=source)
+        except DuplicateLead as e:
+            # Nobody is around to answer the offer; point the item at the closest matching lead.
+            item.update(status="done", lead_id=str(e.matches[0].lead.id), research_source="duplicate")
+        except Exception as e:
+            item.update(status="failed", error=str(e) or e.__class__.__name__)
+        item["duration_seconds"] = round(time.monotonic() - started, 3)
+
+    async def _save(self, run: BatchRun) -> None:
+        doc = run.snapshot().model_dump()
+        doc["_id"] = doc.pop("id")
+        await get_batches_collection().replace_one({"_id": run.id}, doc, upsert=True)
+
+    def _trim(self) -> None:
+        finished = [run_id for run_id, run in self._runs.items() if run.task is None or run.task.done()]
+        for run_id in finished[: max(0, len(self._runs) - self.history)]:
+            del self._runs[run_id]
+
+batch_runner = BatchRunner(settings.BATCH_CONCURRENCY, settings.BATCH_WRITE_SIZE, settings.BATCH_HISTORY)
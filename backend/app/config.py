@@ -1,14 +1,107 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
+def _float_map(raw: str) -> dict[str, float]:
+    """Parse "name=value,name=value" overrides."""
+    values = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            values[name.strip()] = float(value)
+    return values
+
 class Settings(BaseSettings):
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_BASE_URL: str | None = None
     MONGODB_URI: str = "mongodb://localhost:27017"
     MONGODB_DB: str = "lead_intelligence"
     CLEARBIT_API_KEY: str | None = None
     PROXYCURL_API_KEY: str | None = None
     FRONTEND_URLS: str = "http://localhost:5173,http://localhost:3000"
+    AGENT_EXECUTION_MODE: str = "graph"
+    AGENT_GENERATION_MODE: str = "separate"
+    AGENT_REASONING_MODE: str = "summary"
+    HTTP_USER_AGENT: str = "Mozilla/5.0"
+    HTTP_HTTP2: bool = False
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 6
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_POOL_TIMEOUT: float = 10.0
+    HTTP_HEDGE_DELAY_SECONDS: float = 0.25
+    TECH_SIGNATURES_PATH: str | None = None
+    PAGE_CACHE_TTL_SECONDS: float = 300.0
+    PAGE_CACHE_MAX_ENTRIES: int = 256
+    PAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PAGE_MAX_BYTES: int = 2 * 1024 * 1024
+    SCRAPER_PARSER: str = "html.parser"
+    SCRAPER_HOMEPAGE_URLS: str = "https://{domain},https://www.{domain},http://{domain}"
+    SCRAPER_MAX_TEXT_CHUNKS: int = 500
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: float = 14 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 4096
+    LLM_CACHE_LOW_TEMPERATURE: float = 0.3
+    LLM_CACHE_POLICIES: str = ""
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200000
+    LLM_DEFAULT_COMPLETION_TOKENS: int = 512
+    LLM_MAX_RETRIES: int = 4
+    LLM_BACKOFF_BASE_SECONDS: float = 1.0
+    LLM_BACKOFF_MAX_SECONDS: float = 60.0
+    RESEARCH_CACHE_MAX_AGE_SECONDS: float = 7 * 24 * 3600
+    RESEARCH_CACHE_SECTION_MAX_AGE: str = ""
+    RESEARCH_DEADLINE_SECONDS: float = 45.0
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+    CONTENT_ZLIB_LEVEL: int = 6
+    RESEARCH_MAX_INFLIGHT: int = 256
+    BATCH_CONCURRENCY: int = 8
+    BATCH_WRITE_SIZE: int = 50
+    BATCH_MAX_ITEMS: int = 5000
+    BATCH_HISTORY: int = 100
+    RESEARCH_EXECUTION: str = "inline"
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = 120.0
+    JOB_HEARTBEAT_SECONDS: float = 20.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: float = 5.0
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    JOB_POLL_SECONDS: float = 0.5
+    JOB_WAIT_SECONDS: float = 180.0
+    JOB_RETENTION_SECONDS: float = 7 * 24 * 3600
+    WORKER_CONCURRENCY: int = 8
+    WORKER_SHUTDOWN_GRACE_SECONDS: float = 60.0
+    WORKER_METRICS_HOST: str = "0.0.0.0"
+    WORKER_METRICS_PORT: int = 0
+    LEAD_SCORER_MODE: str = "llm"
+    LEAD_SCORE_WEIGHTS: str = ""
+    LEAD_SCORE_CATEGORY_WEIGHTS: str = ""
+    LEAD_SCORE_REPLY_FLOOR: float = 0.02
+    LEAD_SCORE_REPLY_CEILING: float = 0.35
+    LEAD_RESCORE_BATCH_SIZE: int = 1000
+    DEDUPE_ENABLED: bool = True
+    DEDUPE_NUM_PERM: int = 128
+    DEDUPE_BANDS: int = 16
+    DEDUPE_THRESHOLD: float = 0.75
+    DEDUPE_SITE_THRESHOLD: float = 0.9
+    GC_FREEZE_AFTER_STARTUP: bool = False
+
+    @property
+    def research_section_max_age(self) -> dict[str, float]:
+        return _float_map(self.RESEARCH_CACHE_SECTION_MAX_AGE)
+
+    @property
+    def lead_score_weights(self) -> dict[str, float]:
+        return _float_map(self.LEAD_SCORE_WEIGHTS)
+
+    @property
+    def lead_score_category_weights(self) -> dict[str, float]:
+        return _float_map(self.LEAD_SCORE_CATEGORY_WEIGHTS)
+
+    @property
+    def homepage_url_templates(self) -> list[str]:
+        return [template.strip() for template in self.SCRAPER_HOMEPAGE_URLS.split(",") if template.strip()]
 
     @property
     def cors_origins(self) -> list[str]:
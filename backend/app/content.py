@@ -0,0 +1,79 @@
+import hashlib
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from bson import Binary
+
+from app.config import get_settings
+from app.models.database import get_db
+
+settings = get_settings()
+
+def get_contents_collection():
+    return get_db()["page_contents"]
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class ContentStore:
+    """Content-addressed, zlib-compressed text blobs shared by every lead that scraped the same text.
+
+    Blobs are keyed by the SHA-256 of the normalized text, so re-researching an unchanged site stores nothing new.
+    """
+
+    def __init__(self, level: int):
+        self.level = level
+
+    async def put(self, text: str, normalize: bool = True) -> Optional[Dict[str, Any]]:
+        """Store ``text`` once and return the reference a lead keeps in its place, or None for empty text."""
+        text = normalize_text(text) if normalize else text
+        if not text:
+            return None
+        raw = text.encode("utf-8")
+        digest = content_hash(text)
+        now = datetime.utcnow()
+        await get_contents_collection().update_one(
+            {"_id": digest},
+            {
+                "$setOnInsert": {"codec": "zlib", "data": Binary(zlib.compress(raw, self.level)), "size": len(raw), "created_at": now},
+                "$set": {"last_seen_at": now},
+            },
+            upsert=True,
+        )
+        return {"hash": digest, "size": len(raw)}
+
+    async def get_many(self, refs: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, str]:
+        hashes = list({ref["hash"] for ref in refs if ref})
+        if not hashes:
+            return {}
+        cursor = get_contents_collection().find({"_id": {"$in": hashes}}, {"data": 1})
+        return {doc["_id"]: zlib.decompress(doc["data"]).decode("utf-8") async for doc in cursor}
+
+content_store = ContentStore(settings.CONTENT_ZLIB_LEVEL)
+
+async def externalize_lead_content(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Move scraped full_text and the reasoning chain out of ``doc`` into the content store, leaving references."""
+    raw_content = (doc.get("company_intelligence") or {}).get("raw_content")
+    if isinstance(raw_content, dict) and isinstance(raw_content.get("full_text"), str):
+        ref = await content_store.put(raw_content.pop("full_text"))
+        if ref:
+            raw_content["full_text_ref"] = ref
+    if isinstance(doc.get("reasoning_chain"), list):
+        chain = doc.pop("reasoning_chain")
+        ref = await content_store.put(json.dumps(chain), normalize=False) if chain else None
+        if ref:
+            doc["reasoning_chain_ref"] = ref
+    return doc
+
+async def load_lead_content(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Scraped text and reasoning chain of a lead, whether stored inline (older leads) or by reference."""
+    raw_content = (doc.get("company_intelligence") or {}).get("raw_content") or {}
+    text_ref, chain_ref = raw_content.get("full_text_ref"), doc.get("reasoning_chain_ref")
+    blobs = await content_store.get_many([text_ref, chain_ref])
+    full_text = blobs.get(text_ref["hash"], "") if text_ref else raw_content.get("full_text", "")
+    reasoning_chain: List[str] = json.loads(blobs[chain_ref["hash"]]) if chain_ref and chain_ref["hash"] in blobs else doc.get("reasoning_chain", [])
+    return {"full_text": full_text, "reasoning_chain": reasoning_chain}
@@ -0,0 +1,364 @@
+import asyncio
+import copy
+import logging
+import re
+import threading
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from bson import ObjectId
+import numpy as np
+
+from app.config import get_settings
+from app.models.database import get_leads_collection
+from app.agent.core import resolve_domain
+
+settings = get_settings()
+_logger = logging.getLogger("uvicorn.error")
+
+# Trailing words that do not change which company a name refers to.
+LEGAL_SUFFIXES = frozenset(
+    "inc incorporated llc l.l.c ltd limited corp corporation co company gmbh ag sa sas sarl srl spa plc bv nv oy ab as pty pte kk".split()
+)
+# The same, glued to the end of a domain label by infer_domain ("Acme Inc" -> acmeinc.com). "co" is left out: too many real names end in it.
+DOMAIN_LEGAL_SUFFIXES = ("incorporated", "corporation", "limited", "inc", "llc", "ltd", "corp", "gmbh", "plc")
+SECOND_LEVEL_SUFFIXES = frozenset("co com net org gov ac edu ltd plc ne or".split())
+LEAD_INDEX_PROJECTION = {
+    "company_name": 1, "company_domain": 1, "icp_persona": 1, "created_at": 1,
+    "company_intelligence.source_url": 1, "company_intelligence.final_url": 1,
+    "company_intelligence.raw_content.title": 1, "company_intelligence.raw_content.description": 1,
+}
+_WORD = re.compile(r"[a-z0-9]+")
+_DIGITS = re.compile(r"\d+")
+# A site key shared by more leads than this is boilerplate (a parked page, a site builder's default text), not identity.
+BOILERPLATE_LEADS = 5
+# Namespaces: company identity keys (name, domain, final host) match each other; site keys (title + description) match only site keys.
+IDENTITY, SITE = "id", "site"
+_PRIME = 4294967311  # smallest prime above 2**32, so a * h + b stays below 2**64
+
+class DuplicateLead(Exception):
+    def __init__(self, matches: List["DuplicateMatch"]):
+        super().__init__(f"{len(matches)} existing lead(s) look like the same company")
+        self.matches = matches
+
+def _ascii_words(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return _WORD.findall(text.replace("&", " and "))
+
+def domain_key(value: Optional[str]) -> str:
+    """Registrable label of a domain or URL: https://www.Acme-Inc.co.uk/about -> acme."""
+    if not value:
+        return ""
+    value = value.strip().lower()
+    host = urlsplit(value if "//" in value else f"//{value}").hostname or ""
+    labels = [label for label in host.split(".") if label and label != "www"]
+    if len(labels) > 1:
+        labels.pop()
+        if len(labels) > 1 and labels[-1] in SECOND_LEVEL_SUFFIXES:
+            labels.pop()
+    label = labels[-1].replace("-", "") if labels else ""
+    for suffix in DOMAIN_LEGAL_SUFFIXES:
+        if label.endswith(suffix) and len(label) - len(suffix) >= 3:
+            return label[: -len(suffix)]
+    return label
+
+def company_key(name: Optional[str]) -> str:
+    """Company name without case, punctuation, accents or legal form: "The Acmé, Inc." -> acme."""
+    if not name:
+        return ""
+    if "." in name and " " not in name.strip():
+        return domain_key(name)
+    words = _ascii_words(name)
+    if words and words[0] == "the" and len(words) > 1:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return "".join(words)
+
+def site_key(title: Optional[str], description: Optional[str]) -> str:
+    words = _ascii_words(f"{title or ''} {(description or '')[:300]}")
+    # Titles alone ("Home", "Welcome") say nothing about identity.
+    return " ".join(words) if len(words) >= 6 else ""
+
+def persona_key(persona: Optional[str]) -> str:
+    return " ".join(_ascii_words(persona or ""))
+
+def shingles(key: str, namespace: str) -> frozenset:
+    if namespace == SITE:
+        words = key.split()
+        return frozenset(" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2)))
+    padded = f"^{key}$"
+    return frozenset(padded[i:i + 3] for i in range(max(1, len(padded) - 2)))
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+class MinHasher:
+    def __init__(self, num_perm: int, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, grams: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % _PRIME).min(axis=0)
+
+@dataclass
+class IndexedLead:
+    id: ObjectId
+    company_name: str
+    company_domain: str
+    icp_persona: str
+    persona: str
+    created_at: Optional[datetime]
+    keys: List[Tuple[str, str]] = field(default_factory=list)
+
+@dataclass
+class DuplicateMatch:
+    lead: IndexedLead
+    similarity: float
+    matched_on: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": str(self.lead.id), "company_name": self.lead.company_name, "company_domain": self.lead.company_domain,
+            "icp_persona": self.lead.icp_persona,
+            "created_at": self.lead.created_at.isoformat() if self.lead.created_at else None,
+            "similarity": round(self.similarity, 3), "matched_on": self.matched_on,
+        }
+
+class DuplicateIndex:
+    """In-memory MinHash/LSH index of company identity across stored leads.
+
+    Every lead contributes normalized keys: its company name, its domain and the host it finally redirected to
+    (which match one another), plus a title/description key that only matches other sites. Identical keys are found
+    by dict lookup; near-identical ones through LSH band buckets and a Jaccard check on their shingles.
+    A lookup touches a handful of dicts and one small matrix product, so it takes well under a millisecond.
+    """
+
+    def __init__(self, num_perm: int, bands: int, threshold: float, site_threshold: float):
+        if num_perm % bands:
+            raise ValueError("DEDUPE_NUM_PERM must be a multiple of DEDUPE_BANDS")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.thresholds = {IDENTITY: threshold, SITE: site_threshold}
+        self.leads: Dict[ObjectId, IndexedLead] = {}
+        # Holder sets are replaced, never mutated, so a snapshot only has to copy the dict.
+        self._exact: Dict[Tuple[str, str], FrozenSet[ObjectId]] = {}
+        # Bucket sets are mutated in place and shared with clustering snapshots, so every access holds the lock.
+        self._buckets: Dict[Tuple[str, str, int, int], Set[str]] = {}
+        self._buckets_lock = threading.Lock()
+        # Shingles and LSH band hashes of every indexed key.
+        self._sketches: Dict[Tuple[str, str], Tuple[frozenset, Tuple[int, ...]]] = {}
+        self.enabled = False
+        self.ready = False
+        self._loader: Optional[asyncio.Task] = None
+
+    def _sketch(self, namespace: str, key: str) -> Tuple[frozenset, Tuple[int, ...]]:
+        sketch = self._sketches.get((namespace, key))
+        if sketch is None:
+            grams = shingles(key, namespace)
+            rows = self.hasher.signature(grams).reshape(self.bands, -1)
+            sketch = (grams, tuple(hash(row.tobytes()) for row in rows))
+        return sketch
+
+    @staticmethod
+    def _bucket_keys(namespace: str, key: str, bands: Tuple[int, ...]) -> List[Tuple[str, str, int, int]]:
+        # Keys with different numbers never match ("Studio 54" and "Studio 5" are different companies), so they do
+        # not share buckets either; names that differ only by a number would otherwise pile into the same ones.
+        numbers = " ".join(_DIGITS.findall(key))
+        return [(namespace, numbers, band, value) for band, value in enumerate(bands)]
+
+    @staticmethod
+    def lead_keys(doc: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+        intel = doc.get("company_intelligence") or {}
+        raw_content = intel.get("raw_content") or {}
+        candidates = [
+            (IDENTITY, company_key(doc.get("company_name")), "company_name"),
+            (IDENTITY, domain_key(doc.get("company_domain")), "company_domain"),
+            (IDENTITY, domain_key(intel.get("final_url") or intel.get("source_url")), "final_url"),
+            (SITE, site_key(raw_content.get("title"), raw_content.get("description")), "site"),
+        ]
+        seen, keys = set(), []
+        for namespace, key, source in candidates:
+            if len(key) >= 2 and (namespace, key) not in seen:
+                seen.add((namespace, key))
+                keys.append((namespace, key, source))
+        return keys
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        """Index (or re-index) a stored lead; a no-op in processes that never loaded the index."""
+        if not self.enabled or doc.get("_id") is None:
+            return
+        self.remove(doc["_id"])
+        lead = IndexedLead(
+            id=doc["_id"], company_name=doc.get("company_name") or "", company_domain=doc.get("company_domain") or "",
+            icp_persona=doc.get("icp_persona") or "", persona=persona_key(doc.get("icp_persona")), created_at=doc.get("created_at"),
+        )
+        for namespace, key, _ in self.lead_keys(doc):
+            lead.keys.append((namespace, key))
+            if (namespace, key) not in self._exact:
+                sketch = self._sketches[(namespace, key)] = self._sketch(namespace, key)
+                with self._buckets_lock:
+                    for bucket in self._bucket_keys(namespace, key, sketch[1]):
+                        self._buckets.setdefault(bucket, set()).add(key)
+            self._exact[(namespace, key)] = self._exact.get((namespace, key), frozenset()) | {lead.id}
+        self.leads[lead.id] = lead
+
+    def remove(self, lead_id: ObjectId) -> None:
+        lead = self.leads.pop(lead_id, None)
+        if lead is None:
+            return
+        for namespace, key in lead.keys:
+            holders = self._exact.get((namespace, key))
+            if holders is None:
+                continue
+            if len(holders) > 1:
+                self._exact[(namespace, key)] = holders - {lead_id}
+                continue
+            # Last lead with this key: drop it from the LSH buckets too.
+            del self._exact[(namespace, key)]
+            _, bands = self._sketches.pop((namespace, key))
+            with self._buckets_lock:
+                for bucket_key in self._bucket_keys(namespace, key, bands):
+                    bucket = self._buckets.get(bucket_key)
+                    if bucket is not None:
+                        bucket.discard(key)
+                        if not bucket:
+                            del self._buckets[bucket_key]
+
+    def _similar_keys(self, namespace: str, key: str) -> Dict[str, float]:
+        """Indexed keys in ``namespace`` similar to ``key``, with their shingle Jaccard similarity."""
+        similar = {key: 1.0} if (namespace, key) in self._exact else {}
+        grams, bands = self._sketch(namespace, key)
+        candidates: Set[str] = set()
+        with self._buckets_lock:
+            for bucket in self._bucket_keys(namespace, key, bands):
+                candidates |= self._buckets.get(bucket, set())
+        for candidate in candidates - {key}:
+            sketch = self._sketches.get((namespace, candidate))
+            if sketch is None:
+                # Indexed after the clustering snapshot was taken.
+                continue
+            score = jaccard(grams, sketch[0])
+            if score >= self.thresholds[namespace]:
+                similar[candidate] = score
+        return similar
+
+    def find(self, company_name: Optional[str], company_domain: Optional[str], icp_persona: Optional[str] = None,
+             limit: int = 5) -> List[DuplicateMatch]:
+        """Stored leads that look like the company in a research request, most similar first.
+
+        Only leads for the same persona count, and leads stored under exactly the requested domain are left to the
+        research cache, which already reuses them.
+        """
+        if not self.leads:
+            return []
+        domain = resolve_domain(company_name, company_domain)
+        persona = persona_key(icp_persona) if icp_persona is not None else None
+        queries = [(company_key(company_name), "company_name"), (domain_key(domain), "company_domain")]
+        best: Dict[ObjectId, DuplicateMatch] = {}
+        for key, source in queries:
+            if len(key) < 2:
+                continue
+            for similar, score in self._similar_keys(IDENTITY, key).items():
+                for lead_id in self._exact[(IDENTITY, similar)]:
+                    lead = self.leads[lead_id]
+                    if (persona is not None and lead.persona != persona) or lead.company_domain == domain:
+                        continue
+                    if lead_id not in best or score > best[lead_id].similarity:
+                        best[lead_id] = DuplicateMatch(lead, score, source)
+        # Most similar first, newest first among equals.
+        matches = sorted(best.values(), key=lambda m: m.lead.created_at or datetime.min, reverse=True)
+        return sorted(matches, key=lambda m: m.similarity, reverse=True)[:limit]
+
+    async def clusters(self, min_size: int = 2) -> List[List[IndexedLead]]:
+        """Groups of stored leads for the same company and persona, largest first.
+
+        Clustering compares every key with its LSH neighbours (seconds for tens of thousands of leads), so it runs in a
+        thread on a snapshot of the index; lookups and inserts carry on against the live index meanwhile. The LSH
+        buckets (hundreds of thousands of sets) are too big to copy on the loop, so the snapshot shares them under
+        ``_buckets_lock`` and skips keys it does not know.
+        """
+        snapshot = copy.copy(self)
+        snapshot.leads = dict(self.leads)
+        snapshot._exact = dict(self._exact)
+        snapshot._sketches = dict(self._sketches)
+        return await asyncio.to_thread(snapshot._cluster, min_size)
+
+    def _cluster(self, min_size: int) -> List[List[IndexedLead]]:
+        parent: Dict[ObjectId, ObjectId] = {lead_id: lead_id for lead_id in self.leads}
+
+        def root(lead_id: ObjectId) -> ObjectId:
+            while parent[lead_id] != lead_id:
+                parent[lead_id] = parent[parent[lead_id]]
+                lead_id = parent[lead_id]
+            return lead_id
+
+        def union(lead_ids: Iterable[ObjectId]) -> None:
+            # Only leads researched for the same persona are duplicates of each other.
+            first_by_persona: Dict[str, ObjectId] = {}
+            for lead_id in lead_ids:
+                persona = self.leads[lead_id].persona
+                first = first_by_persona.setdefault(persona, lead_id)
+                parent[root(lead_id)] = root(first)
+
+        def usable(namespace: str, key: str) -> bool:
+            return namespace != SITE or len(self._exact[(namespace, key)]) <= BOILERPLATE_LEADS
+
+        done: Set[Tuple[str, str]] = set()
+        for (namespace, key), holders in list(self._exact.items()):
+            if not usable(namespace, key):
+                continue
+            group = set(holders)
+            for similar in self._similar_keys(namespace, key):
+                if (namespace, similar) not in done and usable(namespace, similar):
+                    group |= self._exact[(namespace, similar)]
+            done.add((namespace, key))
+            if len(group) > 1:
+                union(group)
+
+        groups: Dict[ObjectId, List[IndexedLead]] = {}
+        for lead_id, lead in self.leads.items():
+            groups.setdefault(root(lead_id), []).append(lead)
+        clusters = [sorted(group, key=lambda lead: lead.created_at or datetime.min) for group in groups.values() if len(group) >= min_size]
+        return sorted(clusters, key=len, reverse=True)
+
+    async def load(self, batch_size: int = 1000) -> None:
+        self.enabled = True
+        count = 0
+        async for doc in get_leads_collection().find({}, LEAD_INDEX_PROJECTION).batch_size(batch_size):
+            if doc["_id"] not in self.leads:
+                self.add(doc)
+            count += 1
+            if count % 200 == 0:
+                # Indexing is CPU work (~0.25 ms a lead); let requests through while a large collection loads.
+                await asyncio.sleep(0)
+        self.ready = True
+        _logger.info("Duplicate index ready: %d leads, %d keys", len(self.leads), len(self._exact))
+
+    def start(self) -> None:
+        """Load the index in the background; lookups see whatever has been loaded so far."""
+        if settings.DEDUPE_ENABLED and self._loader is None:
+            self._loader = asyncio.create_task(self.load())
+            self._loader.add_done_callback(self._loaded)
+
+    async def wait_loaded(self) -> None:
+        """Wait for the background load to finish, however it ends."""
+        if self._loader is not None:
+            await asyncio.wait({self._loader})
+
+    def _loaded(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            _logger.error("Loading the duplicate index failed", exc_info=task.exception())
+
+    async def stop(self) -> None:
+        if self._loader is not None and not self._loader.done():
+            self._loader.cancel()
+            await asyncio.gather(self._loader, return_exceptions=True)
+        self._loader = None
+
+duplicate_index = DuplicateIndex(settings.DEDUPE_NUM_PERM, settings.DEDUPE_BANDS, settings.DEDUPE_THRESHOLD, settings.DEDUPE_SITE_THRESHOLD)
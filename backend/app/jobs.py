@@ -0,0 +1,169 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.config import get_settings
+from app.models.database import get_db, get_leads_collection
+from app.models.schemas import LeadInput
+from app.agent.core import STAGE_OUTPUTS
+from app.agent.llm import PRIORITY_INTERACTIVE
+from app.research import research, LeadWriter, ResearchFailed
+from app.dedupe import duplicate_index, DuplicateLead
+
+settings = get_settings()
+
+class JobTimeout(Exception):
+    pass
+
+def get_jobs_collection():
+    return get_db()["research_jobs"]
+
+class JobQueue:
+    """Research jobs in Mongo, claimed by workers under a lease.
+
+    A claimed job stays leased for ``visibility_timeout`` seconds and the worker extends the lease with heartbeats.
+    A job whose lease runs out (worker crashed or hung) becomes claimable again; failures retry with exponential backoff.
+    """
+
+    def __init__(self, visibility_timeout: float, max_attempts: int, retry_base: float, retry_max: float):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+    async def enqueue(self, input_data: LeadInput, priority: int = PRIORITY_INTERACTIVE) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        job = {
+            "_id": ObjectId(),
+            "status": "queued",
+            "input": input_data.model_dump(),
+            "priority": priority,
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await get_jobs_collection().insert_one(job)
+        return job
+
+    async def get(self, job_id: ObjectId, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await get_jobs_collection().find_one({"_id": job_id}, projection)
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically lease the next due job: queued and available, or running with an expired lease."""
+        now = datetime.utcnow()
+        return await get_jobs_collection().find_one_and_update(
+            {"$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "running", "lease_owner": worker_id, "lease_expires_at": now + timedelta(seconds=self.visibility_timeout),
+                         "heartbeat_at": now, "started_at": now, "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", 1), ("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def heartbeat(self, job: Dict[str, Any]) -> bool:
+        """Extend the lease; False means another worker has taken the job over."""
+        now = datetime.utcnow()
+        result = await get_jobs_collection().update_one(
+            self._leased(job),
+            {"$set": {"lease_expires_at": now + timedelta(seconds=self.visibility_timeout), "heartbeat_at": now}},
+        )
+        return result.matched_count == 1
+
+    async def record_stage(self, job: Dict[str, Any], stage: str, output: Any) -> None:
+        await get_jobs_collection().update_one(self._leased(job), {"$set": {f"partial.{stage}": output}})
+
+    async def complete(self, job: Dict[str, Any], lead_id: ObjectId, source: str) -> bool:
+        now = datetime.utcnow()
+        result = await get_jobs_collection().update_one(
+            self._leased(job),
+            {"$set": {"status": "done", "lead_id": lead_id, "research_source": source, "finished_at": now, "updated_at": now},
+             "$unset": {"lease_owner": "", "lease_expires_at": ""}},
+        )
+        return result.matched_count == 1
+
+    async def fail(self, job: Dict[str, Any], error: str) -> bool:
+        """Requeue with backoff, or mark failed once the job has used all its attempts."""
+        now = datetime.utcnow()
+        if job["attempts"] >= job.get("max_attempts", self.max_attempts):
+            update = {"status": "failed", "error": error, "finished_at": now, "updated_at": now}
+        else:
+            delay = min(self.retry_max, self.retry_base * 2 ** (job["attempts"] - 1)) * random.uniform(0.8, 1.2)
+            update = {"status": "queued", "available_at": now + timedelta(seconds=delay), "updated_at": now}
+        result = await get_jobs_collection().update_one(
+            self._leased(job),
+            {"$set": {**update, "last_error": error}, "$unset": {"lease_owner": "", "lease_expires_at": "", "partial": ""}},
+        )
+        return result.matched_count == 1
+
+    async def release(self, job: Dict[str, Any]) -> None:
+        """Hand a job back untouched (worker shutting down); the attempt does not count."""
+        now = datetime.utcnow()
+        await get_jobs_collection().update_one(
+            self._leased(job),
+            {"$set": {"status": "queued", "available_at": now, "updated_at": now},
+             "$unset": {"lease_owner": "", "lease_expires_at": "", "partial": ""}, "$inc": {"attempts": -1}},
+        )
+
+    @staticmethod
+    def _leased(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {"_id": job["_id"], "status": "running", "lease_owner": job["lease_owner"]}
+
+job_queue = JobQueue(settings.JOB_VISIBILITY_TIMEOUT_SECONDS, settings.JOB_MAX_ATTEMPTS, settings.JOB_RETRY_BASE_SECONDS, settings.JOB_RETRY_MAX_SECONDS)
+
+async def research_via_queue(input_data: LeadInput, priority: int = PRIORITY_INTERACTIVE,
+                             on_stage: Optional[Callable[[str, Any], None]] = None) -> Tuple[Dict[str, Any], str]:
+    """Enqueue a research job and wait for a worker to finish it; same contract as research()."""
+    job = await job_queue.enqueue(input_data, priority)
+    loop = asyncio.get_running_loop()
+    give_up = loop.time() + settings.JOB_WAIT_SECONDS
+    seen = set()
+    while True:
+        job = await job_queue.get(job["_id"], {"status": 1, "partial": 1, "lead_id": 1, "research_source": 1, "error": 1})
+        if job is None:
+            raise ResearchFailed("Research job disappeared")
+        if on_stage is not None:
+            for stage in STAGE_OUTPUTS:
+                if stage in (job.get("partial") or {}) and stage not in seen:
+                    seen.add(stage)
+                    on_stage(stage, job["partial"][stage])
+        if job["status"] == "done":
+            lead_doc = await get_leads_collection().find_one({"_id": job["lead_id"]})
+            if lead_doc is None:
+                raise ResearchFailed("Research job finished but its lead is missing")
+            if job["research_source"] != "cache_hit":
+                duplicate_index.add(lead_doc)
+            return lead_doc, job["research_source"]
+        if job["status"] == "failed":
+            raise ResearchFailed(job.get("error") or "Research job failed")
+        if loop.time() > give_up:
+            raise JobTimeout(f"Research job {job['_id']} still {job['status']} after {settings.JOB_WAIT_SECONDS:.0f}s")
+        await asyncio.sleep(settings.JOB_POLL_SECONDS)
+
+async def execute_research(input_data: LeadInput, writer: Optional[LeadWriter] = None, priority: int = PRIORITY_INTERACTIVE,
+                           on_stage: Optional[Callable[[str, Any], None]] = None) -> Tuple[Dict[str, Any], str]:
+    """Run research in this process or hand it to the worker pool, per RESEARCH_EXECUTION.
+
+    Unless ``input_data.on_duplicate`` is "research", a stored lead that looks like the same company under another
+    name or domain is offered (DuplicateLead) or returned as a "duplicate" before any agent work starts.
+    """
+    if input_data.on_duplicate != "research" and input_data.cache_mode == "prefer":
+        matches = duplicate_index.find(input_data.company_name, input_data.company_domain, input_data.icp_persona)
+        if matches and input_data.on_duplicate == "offer":
+            raise DuplicateLead(matches)
+        if matches:
+            lead_doc = await get_leads_collection().find_one({"_id": matches[0].lead.id})
+            if lead_doc is not None:
+                return lead_doc, "duplicate"
+    if settings.RESEARCH_EXECUTION == "queue":
+        return await research_via_queue(input_data, priority, on_stage)
+    return await research(input_data, writer=writer, on_stage=on_stage)
@@ -1,21 +1,55 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import gc
+import orjson
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
-from datetime import datetime
+from typing import Any, AsyncIterator
 from bson import ObjectId
 
 from app.config import get_settings
-from app.models.database import init_db, close_db, get_leads_collection, serialize_lead
-from app.models.schemas import LeadInput, LeadResponse, LeadList, LeadAnalysis, DecisionMaker, TechStackItem, GeneratedEmail, LeadScore
-from app.agent.core import LeadIntelligenceAgent
+from app.models.database import init_db, close_db, get_leads_collection
+from app.models.schemas import LeadInput, LeadResponse, LeadList, LeadContent, BatchResearchInput, BatchStatus, ResearchJobStatus, RescoreRequest, RescoreResult, DuplicateClusters
+from app.agent.http import init_http_client, close_http_client
+from app.agent.llm import llm
+from app.agent.techdetect import get_engine
+from app.metrics import registry, CONTENT_TYPE, FALLBACKS
+from app.research import STAGE_SECTIONS
+from app.jobs import execute_research, job_queue, JobTimeout
+from app.content import load_lead_content
+from app.pagination import encode_cursor, keyset_filter, InvalidCursor
+from app.views import (
+    LEAD_SUMMARY_PROJECTION, LEAD_VIEW_PROJECTION, LEAD_CONTENT_PROJECTION, format_lead_response, format_lead_summary,
+    has_current_view, refresh_lead_view, lead_payload,
+)
+from app.singleflight import SingleFlightFull
+from app.rescore import rescore_leads
+from app.dedupe import duplicate_index, DuplicateLead
+from app.batch import batch_runner, parse_csv, BatchInputError
+
+async def freeze_after_startup() -> None:
+    """Move what startup allocated (the duplicate index above all: millions of containers, no cycles) out of the
+    collector's generations, so full collections stop walking it and stalling the event loop."""
+    await duplicate_index.wait_loaded()
+    gc.freeze()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await init_http_client()
+    get_engine()  # compile tech signatures before the first request
+    duplicate_index.start()
+    freezer = asyncio.create_task(freeze_after_startup()) if settings.GC_FREEZE_AFTER_STARTUP else None
     yield
+    if freezer is not None:
+        freezer.cancel()
+    await duplicate_index.stop()
+    await batch_runner.shutdown()
+    await close_http_client()
     await close_db()
 
-app = FastAPI(title="AI Lead Intelligence Agent", version="1.0.0", lifespan=lifespan)
+app = FastAPI(title="AI Lead Intelligence Agent", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 settings = get_settings()
 
@@ -30,44 +64,177 @@ app.add_middleware(
 @app.post("/api/leads/research", response_model=LeadResponse)
 async def research_lead(input_data: LeadInput):
     try:
-        agent = LeadIntelligenceAgent()
-        result = await agent.run(input_data.company_name, input_data.company_domain, input_data.icp_persona)
-        if result.get("status") != "complete":
-            raise HTTPException(status_code=500, detail=result.get("error", "Agent failed"))
-        
-        data = result["data"]
-        lead_doc = {
-            "company_name": result["company_name"] or result["company_domain"],
-            "company_domain": result["company_domain"] or "",
-            "icp_persona": result["icp_persona"],
-            "company_intelligence": data.get("company_intelligence", {}),
-            "decision_makers": data.get("decision_makers", []),
-            "tech_stack": data.get("tech_stack", []),
-            "pain_hypothesis": data.get("pain_hypothesis", ""),
-            "generated_email": data.get("generated_email", {}),
-            "lead_score": data.get("lead_score", {}),
-            "reasoning_chain": result.get("reasoning_chain", []),
-            "steps_executed": result.get("steps_executed", 0),
-            "status": "new",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-        }
-        collection = get_leads_collection()
-        insert_result = await collection.insert_one(lead_doc)
-        lead_doc["_id"] = insert_result.inserted_id
-        return format_lead_response(lead_doc)
+        lead_doc, source = await execute_research(input_data)
+        if not has_current_view(lead_doc):
+            lead_doc = await refresh_lead_view(get_leads_collection(), lead_doc["_id"]) or lead_doc
+        return ORJSONResponse({**lead_payload(lead_doc), "research_source": source})
+    except DuplicateLead as e:
+        raise HTTPException(status_code=409, detail=duplicate_detail(e))
+    except SingleFlightFull as e:
+        raise HTTPException(status_code=503, detail=f"Research capacity exhausted: {e}")
+    except JobTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/leads/research/stream")
+async def research_lead_stream_get(input_data: LeadInput = Depends()):
+    return stream_research(input_data)
+
+@app.post("/api/leads/research/stream")
+async def research_lead_stream(input_data: LeadInput):
+    return stream_research(input_data)
+
+def stream_research(input_data: LeadInput) -> StreamingResponse:
+    """Server-sent events: ``started``, one ``stage`` per completed agent stage, then ``lead``, ``duplicate`` or ``error``."""
+    return StreamingResponse(
+        research_events(input_data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+def duplicate_detail(e: DuplicateLead) -> dict:
+    return {"message": "Existing leads look like the same company; resend with on_duplicate='reuse' or 'research'", "duplicates": [match.as_dict() for match in e.matches]}
+
+async def research_events(input_data: LeadInput) -> AsyncIterator[str]:
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(execute_research(input_data, on_stage=lambda stage, output: queue.put_nowait((stage, output))))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    partial = {"company_name": input_data.company_name or input_data.company_domain or "", "company_domain": input_data.company_domain or "", "icp_persona": input_data.icp_persona}
+    try:
+        yield sse_event("started", partial)
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), settings.STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line so proxies do not close an idle stream.
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                break
+            stage, output = item
+            partial[STAGE_SECTIONS[stage]] = output
+            lead = format_lead_response(dict(partial)).model_dump(mode="json")
+            yield sse_event("stage", {"stage": stage, "section": STAGE_SECTIONS[stage], "lead": lead})
+        lead_doc, source = task.result()
+        if not has_current_view(lead_doc):
+            lead_doc = await refresh_lead_view(get_leads_collection(), lead_doc["_id"]) or lead_doc
+        yield sse_event("lead", {**lead_payload(lead_doc), "research_source": source})
+    except DuplicateLead as e:
+        yield sse_event("duplicate", duplicate_detail(e))
+    except SingleFlightFull as e:
+        yield sse_event("error", {"status_code": 503, "detail": f"Research capacity exhausted: {e}"})
+    except JobTimeout as e:
+        yield sse_event("error", {"status_code": 504, "detail": str(e)})
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": str(e)})
+    finally:
+        # The agent run itself is shielded by the single-flight group and still stores the lead.
+        task.cancel()
+
+@app.post("/api/leads/research/jobs", response_model=ResearchJobStatus, status_code=202)
+async def enqueue_research_job(input_data: LeadInput):
+    """Queue research for the worker pool (python -m app.worker) and return at once; poll the job for the lead."""
+    if input_data.on_duplicate != "research" and input_data.cache_mode == "prefer":
+        matches = duplicate_index.find(input_data.company_name, input_data.company_domain, input_data.icp_persona)
+        if matches:
+            # Jobs have no "duplicate" outcome; offer the stored leads and let the client decide.
+            raise HTTPException(status_code=409, detail=duplicate_detail(DuplicateLead(matches)))
+    return format_job(await job_queue.enqueue(input_data))
+
+@app.get("/api/leads/research/jobs/{job_id}", response_model=ResearchJobStatus)
+async def get_research_job(job_id: str):
+    try:
+        oid = ObjectId(job_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid job id")
+    job = await job_queue.get(oid, {"input": 0, "partial": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Not found")
+    return format_job(job)
+
+def format_job(job: dict) -> ResearchJobStatus:
+    return ResearchJobStatus(
+        id=str(job["_id"]),
+        lead_id=str(job["lead_id"]) if job.get("lead_id") else None,
+        **{k: job.get(k) for k in ResearchJobStatus.model_fields if k not in ("id", "lead_id") and k in job},
+    )
+
+@app.post("/api/leads/research/batch", response_model=BatchStatus, status_code=202)
+async def research_batch(batch: BatchResearchInput):
+    try:
+        run = await batch_runner.submit(batch.leads, batch.concurrency)
+    except BatchInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return run.snapshot(include_items=False)
+
+@app.post("/api/leads/research/batch/csv", response_model=BatchStatus, status_code=202)
+async def research_batch_csv(file: UploadFile = File(...), icp_persona: str | None = None, concurrency: int | None = None):
+    try:
+        leads = parse_csv(await file.read(), default_persona=icp_persona)
+        run = await batch_runner.submit(leads, concurrency)
+    except (BatchInputError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return run.snapshot(include_items=False)
+
+@app.get("/api/leads/research/batch/{batch_id}", response_model=BatchStatus)
+async def get_research_batch(batch_id: str):
+    status = await batch_runner.get(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return status
+
+@app.post("/api/leads/rescore", response_model=RescoreResult)
+async def rescore(request: RescoreRequest):
+    """Re-score stored leads with the local scorer (no LLM calls); all leads unless ids or a persona are given."""
+    query: dict = {}
+    if request.lead_ids is not None:
+        try:
+            query["_id"] = {"$in": [ObjectId(lead_id) for lead_id in request.lead_ids]}
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid lead id")
+    if request.icp_persona is not None:
+        query["icp_persona"] = request.icp_persona
+    try:
+        return await rescore_leads(query, dry_run=request.dry_run)
+    except ValueError as e:
+        # Bad LEAD_SCORE_WEIGHTS.
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/leads/duplicates", response_model=DuplicateClusters)
+async def list_duplicates(min_size: int = Query(2, ge=2), limit: int = Query(100, ge=1, le=1000)):
+    """Stored leads that look like the same company for the same persona, grouped, largest groups first."""
+    clusters = await duplicate_index.clusters(min_size)
+    return {
+        "clusters": [
+            {"icp_persona": group[0].icp_persona, "leads": [
+                {"id": str(lead.id), "company_name": lead.company_name, "company_domain": lead.company_domain, "created_at": lead.created_at} for lead in group
+            ]}
+            for group in clusters[:limit]
+        ],
+        "total_clusters": len(clusters),
+        "duplicate_leads": sum(len(group) for group in clusters),
+        "indexed_leads": len(duplicate_index.leads),
+        "index_ready": duplicate_index.ready,
+    }
+
 @app.get("/api/leads", response_model=LeadList)
-async def list_leads(skip: int = 0, limit: int = 50):
+async def list_leads(cursor: str | None = None, limit: int = Query(50, ge=1, le=200), include_total: bool = False):
     collection = get_leads_collection()
-    total = await collection.count_documents({})
-    cursor = collection.find({}).sort("created_at", -1).skip(skip).limit(limit)
-    leads = [format_lead_response(doc) async for doc in cursor]
-    return LeadList(leads=leads, total=total)
+    try:
+        query = keyset_filter(cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    docs = await collection.find(query, LEAD_SUMMARY_PROJECTION).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    total = await collection.estimated_document_count() if include_total else None
+    # Summaries are built from typed projections; skip response_model re-validation on the hot path.
+    return ORJSONResponse({"leads": [format_lead_summary(doc) for doc in docs[:limit]], "next_cursor": next_cursor, "total": total})
 
 @app.get("/api/leads/{lead_id}", response_model=LeadResponse)
 async def get_lead(lead_id: str):
@@ -76,86 +243,37 @@ async def get_lead(lead_id: str):
         oid = ObjectId(lead_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid lead id")
-    doc = await collection.find_one({"_id": oid})
+    doc = await collection.find_one({"_id": oid}, LEAD_VIEW_PROJECTION)
+    if doc and not has_current_view(doc):
+        doc = await refresh_lead_view(collection, oid)
     if not doc:
         raise HTTPException(status_code=404, detail="Not found")
-    return format_lead_response(doc)
+    return ORJSONResponse(lead_payload(doc))
+
+@app.get("/api/leads/{lead_id}/content", response_model=LeadContent)
+async def get_lead_content(lead_id: str):
+    try:
+        oid = ObjectId(lead_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid lead id")
+    doc = await get_leads_collection().find_one({"_id": oid}, LEAD_CONTENT_PROJECTION)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Not found")
+    return await load_lead_content(doc)
+
+@app.get("/api/llm/stats")
+async def llm_stats():
+    return {"cache": llm.cache.stats, "scheduler": llm.scheduler.snapshot(), "fallbacks": {source: int(count) for (source,), count in FALLBACKS.values().items()}}
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint for this API process; workers serve their own with --metrics-port."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy"}
 
-def format_lead_response(lead: dict) -> LeadResponse:
-    doc = serialize_lead(lead)
-    company_intel = doc.get("company_intelligence", {}) or {}
-    raw_content = company_intel.get("raw_content", {}) or {}
-    decision_makers = doc.get("decision_makers", []) or []
-    tech_stack = doc.get("tech_stack", []) or []
-    lead_score = doc.get("lead_score", {}) or {}
-    generated_email = doc.get("generated_email", {}) or {}
-    personalization_elements = generated_email.get("personalization_elements", [])
-    if isinstance(personalization_elements, dict):
-        personalization_elements = [f"{k}: {v}" for k, v in personalization_elements.items()]
-    elif isinstance(personalization_elements, str):
-        personalization_elements = [personalization_elements]
-    elif not isinstance(personalization_elements, list):
-        personalization_elements = []
-    else:
-        personalization_elements = [str(v) for v in personalization_elements]
-
-    company_summary = raw_content.get("description") or raw_content.get("title") or ""
-    key_insights = []
-    if raw_content.get("title"):
-        key_insights.append(f"Site title: {raw_content.get('title')}")
-    if company_intel.get("source_url"):
-        key_insights.append(f"Source: {company_intel.get('source_url')}")
-
-    return LeadResponse(
-        id=doc.get("id", ""),
-        company_name=doc.get("company_name", ""),
-        company_domain=doc.get("company_domain", ""),
-        icp_persona=doc.get("icp_persona", ""),
-        analysis=LeadAnalysis(
-            company_summary=company_summary,
-            key_insights=key_insights,
-            pain_points=[doc.get("pain_hypothesis")] if doc.get("pain_hypothesis") else [],
-            opportunities=[]
-        ),
-        decision_makers=[
-            DecisionMaker(
-                name=d.get("name", "Unknown"),
-                title=d.get("title", "Executive"),
-                linkedin_url=d.get("linkedin_url"),
-                email=d.get("email"),
-                relevance_score=float(d.get("relevance_score", 0.5))
-            )
-            for d in decision_makers
-        ],
-        tech_stack=[
-            TechStackItem(
-                technology=t.get("technology") or t.get("tech") or "Unknown",
-                category=t.get("category") or "Other",
-                confidence=float(t.get("confidence", 0.5))
-            )
-            for t in tech_stack
-        ],
-        pain_hypothesis=doc.get("pain_hypothesis", ""),
-        generated_email=GeneratedEmail(
-            subject=generated_email.get("subject", ""),
-            body=generated_email.get("body", ""),
-            personalization_elements=personalization_elements,
-            cta=generated_email.get("cta", "")
-        ),
-        score=LeadScore(
-            reply_probability=float(lead_score.get("reply_probability", 0.0)),
-            quality_score=float(lead_score.get("quality_score", 0.0)),
-            reasoning=lead_score.get("reasoning", ""),
-            factors={k: float(v) for k, v in (lead_score.get("factors") or {}).items()}
-        ),
-        status=doc.get("status", "new"),
-        created_at=doc.get("created_at", datetime.utcnow())
-    )
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,203 @@
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from pymongo import monitoring
+
+# Seconds; covers sub-millisecond Mongo commands up to the research deadline.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket in zip(self.buckets, counts):
+                    cumulative += bucket
+                    le = 'le="%s"' % _number(bound)
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+                inf = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, inf)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+registry = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    """Serve GET /metrics from a process that has no API of its own (research workers); one request per connection."""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = (await reader.readline()).split()
+            while (await reader.readline()).strip():
+                pass
+            if request[:1] == [b"GET"] and request[1:2] and request[1].split(b"?")[0] == b"/metrics":
+                status, body = "200 OK", registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+RESEARCH_SECONDS = registry.register(Histogram("leadgen_research_seconds", "Wall time of research requests by how they were served.", ["source"]))
+STAGE_SECONDS = registry.register(Histogram("leadgen_stage_seconds", "Wall time of agent stages and tools.", ["stage", "outcome"]))
+LLM_SECONDS = registry.register(Histogram("leadgen_llm_request_seconds", "OpenAI chat completion latency, excluding time queued for rate budget.", ["tool", "model"]))
+LLM_QUEUE_SECONDS = registry.register(Histogram("leadgen_llm_queue_seconds", "Time LLM calls waited in the rate scheduler.", ["tool"]))
+LLM_TOKENS = registry.register(Counter("leadgen_llm_tokens_total", "Tokens reported in response.usage.", ["tool", "model", "kind"]))
+LLM_CACHE = registry.register(Counter("leadgen_llm_cache_requests_total", "Completion cache lookups by outcome.", ["tool", "outcome"]))
+HTTP_SECONDS = registry.register(Histogram("leadgen_http_fetch_seconds", "Page fetch time, from request to last body byte read.", ["outcome"]))
+HTTP_BYTES = registry.register(Counter("leadgen_http_fetch_bytes_total", "Body bytes read by page fetches.", ["outcome"]))
+PAGE_CACHE = registry.register(Counter("leadgen_page_cache_requests_total", "Page cache lookups by outcome.", ["outcome"]))
+FALLBACKS = registry.register(Counter("leadgen_fallbacks_total", "Fallback paths taken, by source.", ["source"]))
+MONGO_SECONDS = registry.register(Histogram("leadgen_mongo_command_seconds", "MongoDB command latency.", ["command", "outcome"]))
+
+# Timings of the current research run, shared with the tasks the run spawns; stored on the lead as ``timings``.
+_run_timings: ContextVar[Optional[Dict[str, Any]]] = ContextVar("run_timings", default=None)
+
+def track_timings() -> Dict[str, Any]:
+    timings: Dict[str, Any] = {
+        "stages": {},
+        "llm": {"calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0},
+        "http": {"fetches": 0, "seconds": 0.0, "bytes": 0},
+    }
+    _run_timings.set(timings)
+    return timings
+
+def _current(section: str) -> Optional[Dict[str, Any]]:
+    timings = _run_timings.get()
+    return timings[section] if timings is not None else None
+
+def observe_stage(stage: str, seconds: float, outcome: str = "ok") -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage, outcome=outcome)
+    stages = _current("stages")
+    if stages is not None:
+        stages[stage] = round(stages.get(stage, 0.0) + seconds, 4)
+
+def observe_llm(tool: str, model: str, seconds: float, usage: Any) -> None:
+    LLM_SECONDS.observe(seconds, tool=tool, model=model)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    LLM_TOKENS.inc(prompt_tokens, tool=tool, model=model, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, tool=tool, model=model, kind="completion")
+    totals = _current("llm")
+    if totals is not None:
+        totals["calls"] += 1
+        totals["seconds"] = round(totals["seconds"] + seconds, 4)
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+
+def observe_fetch(seconds: float, size: int, outcome: str) -> None:
+    HTTP_SECONDS.observe(seconds, outcome=outcome)
+    HTTP_BYTES.inc(size, outcome=outcome)
+    totals = _current("http")
+    if totals is not None:
+        totals["fetches"] += 1
+        totals["seconds"] = round(totals["seconds"] + seconds, 4)
+        totals["bytes"] += size
+
+def timed(stage: str) -> Callable:
+    """Record the wall time of an async agent step or tool method under ``stage``."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                observe_stage(stage, time.perf_counter() - started, outcome)
+        return wrapper
+    return decorator
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Command latency from the driver's own event timings; pymongo calls these from its worker threads."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
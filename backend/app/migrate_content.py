@@ -0,0 +1,93 @@
+"""Move inline scraped text and reasoning chains of stored leads into the page_contents store.
+
+Run from backend/: python -m app.migrate_content [--batch-size N] [--report-only]
+Prints collection sizes before and after the migration.
+"""
+import argparse
+import asyncio
+from typing import Any, Dict, List
+import bson
+from pymongo import UpdateOne
+
+from app.models.database import init_db, close_db, get_db, get_leads_collection
+from app.content import externalize_lead_content
+from app.views import LEAD_CONTENT_PROJECTION
+
+COLLECTIONS = ("leads", "page_contents")
+INLINE_CONTENT = {"$or": [
+    {"company_intelligence.raw_content.full_text": {"$type": "string"}},
+    {"reasoning_chain": {"$type": "array"}},
+]}
+
+async def collection_sizes(name: str) -> Dict[str, float]:
+    db = get_db()
+    try:
+        stats = await db.command("collStats", name)
+        return {"count": stats.get("count", 0), "size": stats.get("size", 0), "storage": stats.get("storageSize", 0), "indexes": stats.get("totalIndexSize", 0)}
+    except Exception:
+        # Servers without collStats (or in-memory test doubles): measure the BSON directly.
+        count = size = 0
+        async for doc in db[name].find({}):
+            count += 1
+            size += len(bson.encode(doc))
+        return {"count": count, "size": size, "storage": size, "indexes": 0}
+
+async def report(label: str) -> Dict[str, Dict[str, float]]:
+    sizes = {name: await collection_sizes(name) for name in COLLECTIONS}
+    print(f"{label}:")
+    print(f"  {'collection':<14} {'docs':>9} {'data MB':>9} {'storage MB':>11} {'index MB':>9} {'avg KB':>8}")
+    for name, s in sizes.items():
+        average = s["size"] / s["count"] / 1024 if s["count"] else 0.0
+        print(f"  {name:<14} {s['count']:>9} {s['size'] / 1e6:>9.2f} {s['storage'] / 1e6:>11.2f} {s['indexes'] / 1e6:>9.2f} {average:>8.1f}")
+    return sizes
+
+def migration_update(doc: Dict[str, Any]) -> Dict[str, Any]:
+    raw_content = (doc.get("company_intelligence") or {}).get("raw_content") or {}
+    update: Dict[str, Any] = {"$unset": {"company_intelligence.raw_content.full_text": "", "reasoning_chain": ""}}
+    sets = {}
+    if raw_content.get("full_text_ref"):
+        sets["company_intelligence.raw_content.full_text_ref"] = raw_content["full_text_ref"]
+    if doc.get("reasoning_chain_ref"):
+        sets["reasoning_chain_ref"] = doc["reasoning_chain_ref"]
+    if sets:
+        update["$set"] = sets
+    return update
+
+async def migrate(batch_size: int) -> int:
+    leads = get_leads_collection()
+    ops: List[UpdateOne] = []
+    migrated = 0
+    async for doc in leads.find(INLINE_CONTENT, LEAD_CONTENT_PROJECTION).batch_size(batch_size):
+        await externalize_lead_content(doc)
+        ops.append(UpdateOne({"_id": doc["_id"]}, migration_update(doc)))
+        if len(ops) >= batch_size:
+            await leads.bulk_write(ops, ordered=False)
+            migrated += len(ops)
+            ops = []
+    if ops:
+        await leads.bulk_write(ops, ordered=False)
+        migrated += len(ops)
+    return migrated
+
+async def main(batch_size: int, report_only: bool) -> None:
+    await init_db()
+    try:
+        before = await report("Before")
+        if report_only:
+            return
+        migrated = await migrate(batch_size)
+        print(f"\nMigrated {migrated} leads\n")
+        after = await report("After")
+        total_before = sum(s["size"] for s in before.values())
+        total_after = sum(s["size"] for s in after.values())
+        if total_before:
+            print(f"\nData size {total_before / 1e6:.2f} MB -> {total_after / 1e6:.2f} MB ({1 - total_after / total_before:.0%} smaller)")
+    finally:
+        await close_db()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--report-only", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.report_only))
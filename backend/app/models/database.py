@@ -2,6 +2,7 @@ import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 from app.config import get_settings
+from app.metrics import MongoCommandMetrics
 
 _client: AsyncIOMotorClient | None = None
 _db = None
@@ -11,7 +12,7 @@ async def init_db() -> None:
     global _client, _db
     settings = get_settings()
     if _client is None:
-        _client = AsyncIOMotorClient(settings.MONGODB_URI)
+        _client = AsyncIOMotorClient(settings.MONGODB_URI, event_listeners=[MongoCommandMetrics()])
     _db = _client[settings.MONGODB_DB]
     try:
         await _db.command("ping")
@@ -20,8 +21,14 @@ async def init_db() -> None:
         _logger.exception("MongoDB connection failed")
         raise RuntimeError(f"MongoDB connection failed: {exc}") from exc
     await _db["leads"].create_index("created_at")
+    await _db["leads"].create_index([("created_at", -1), ("_id", -1)])
     await _db["leads"].create_index("company_name")
     await _db["leads"].create_index("company_domain")
+    await _db["leads"].create_index([("company_domain", 1), ("icp_persona", 1), ("created_at", -1)])
+    await _db["llm_cache"].create_index("expires_at", expireAfterSeconds=0)
+    await _db["research_jobs"].create_index([("status", 1), ("priority", 1), ("available_at", 1)])
+    await _db["research_jobs"].create_index([("status", 1), ("lease_expires_at", 1)])
+    await _db["research_jobs"].create_index("finished_at", expireAfterSeconds=int(settings.JOB_RETENTION_SECONDS))
 
 def get_db():
     if _db is None:
@@ -1,11 +1,14 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
 class LeadInput(BaseModel):
     company_name: Optional[str] = None
     company_domain: Optional[str] = None
     icp_persona: str = Field(..., description="Target persona")
+    cache_mode: Literal["prefer", "refresh"] = Field("prefer", description="'prefer' reuses a fresh stored lead for the same domain and persona; 'refresh' always runs the full agent")
+    reasoning_mode: Optional[Literal["none", "summary", "full"]] = Field(None, description="Reasoning chain to record; defaults to AGENT_REASONING_MODE")
+    on_duplicate: Literal["offer", "reuse", "research"] = Field("offer", description="When a stored lead looks like the same company under another name or domain: 'offer' returns it as a 409, 'reuse' returns the stored lead, 'research' runs the agent anyway")
 
 class DecisionMaker(BaseModel):
     name: str 
@@ -18,6 +21,7 @@ class TechStackItem(BaseModel):
     technology: str
     category: str
     confidence: float
+    evidence: List[str] = []
 
 class LeadAnalysis(BaseModel):
     company_summary: str
@@ -50,10 +54,101 @@ class LeadResponse(BaseModel):
     score: LeadScore
     status: str
     created_at: datetime
+    research_source: Optional[Literal["cache_hit", "partial_refresh", "full_run", "duplicate"]] = None
     
     class Config:
         from_attributes = True
 
+class LeadContent(BaseModel):
+    full_text: str
+    reasoning_chain: List[str]
+
+class LeadSummaryScore(BaseModel):
+    reply_probability: float = 0.0
+    quality_score: float = 0.0
+
+class LeadSummary(BaseModel):
+    id: str
+    company_name: str
+    company_domain: str
+    icp_persona: str
+    score: LeadSummaryScore
+    status: str
+    created_at: datetime
+
 class LeadList(BaseModel):
-    leads: List[LeadResponse]
+    leads: List[LeadSummary]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to fetch the next page; null on the last page")
+    total: Optional[int] = Field(None, description="Estimated collection size, only when include_total=true")
+
+class BatchResearchInput(BaseModel):
+    leads: List[LeadInput]
+    concurrency: Optional[int] = Field(None, ge=1, description="Parallel agents for this batch, capped by BATCH_CONCURRENCY")
+
+class BatchItemStatus(BaseModel):
+    index: int
+    company_name: Optional[str] = None
+    company_domain: Optional[str] = None
+    status: Literal["pending", "running", "done", "failed"]
+    lead_id: Optional[str] = None
+    research_source: Optional[str] = None
+    error: Optional[str] = None
+    duration_seconds: Optional[float] = None
+
+class BatchStatus(BaseModel):
+    id: str
+    status: Literal["queued", "running", "complete", "interrupted"]
     total: int
+    pending: int
+    running: int
+    completed: int
+    failed: int
+    concurrency: int
+    throughput_per_minute: float
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    items: List[BatchItemStatus] = []
+
+class RescoreRequest(BaseModel):
+    lead_ids: Optional[List[str]] = None
+    icp_persona: Optional[str] = None
+    dry_run: bool = False
+
+class RescoreResult(BaseModel):
+    matched: int
+    updated: int
+    mean_quality_score: Optional[float] = None
+    dry_run: bool
+    seconds: float
+
+class ResearchJobStatus(BaseModel):
+    id: str
+    status: Literal["queued", "running", "done", "failed"]
+    attempts: int
+    max_attempts: int
+    lead_id: Optional[str] = None
+    research_source: Optional[str] = None
+    error: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    available_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class DuplicateLeadRef(BaseModel):
+    id: str
+    company_name: str
+    company_domain: str
+    created_at: Optional[datetime] = None
+
+class DuplicateCluster(BaseModel):
+    icp_persona: str
+    leads: List[DuplicateLeadRef]
+
+class DuplicateClusters(BaseModel):
+    clusters: List[DuplicateCluster]
+    total_clusters: int
+    duplicate_leads: int
+    indexed_leads: int
+    index_ready: bool
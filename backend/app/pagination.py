@@ -0,0 +1,30 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+from bson import ObjectId
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque position after ``doc`` in (created_at desc, _id desc) order."""
+    payload = json.dumps({"t": doc["created_at"].isoformat(), "i": str(doc["_id"])}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"created_at": datetime.fromisoformat(payload["t"]), "_id": ObjectId(payload["i"])}
+    except Exception as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+def keyset_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Mongo filter for the page that starts after ``cursor``; ties on created_at are broken by _id."""
+    if not cursor:
+        return {}
+    position = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": position["created_at"]}},
+        {"created_at": position["created_at"], "_id": {"$lt": position["_id"]}},
+    ]}
@@ -0,0 +1,62 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import UpdateOne
+
+from app.config import get_settings
+from app.models.database import get_leads_collection
+from app.agent.scoring import get_scorer
+from app.views import LEAD_VIEW_VERSION
+
+settings = get_settings()
+
+# What the local scorer reads; scraped text, emails and reasoning stay in Mongo.
+RESCORE_PROJECTION = {
+    "icp_persona": 1, "tech_stack": 1, "decision_makers": 1, "api_view_version": 1,
+    "company_intelligence.raw_content.title": 1, "company_intelligence.raw_content.description": 1,
+    "company_intelligence.source_url": 1, "company_intelligence.error": 1,
+}
+
+def rescore_updates(docs: List[Dict[str, Any]], scores: List[Dict[str, Any]], now: datetime) -> List[UpdateOne]:
+    updates = []
+    for doc, score in zip(docs, scores):
+        fields = {"lead_score": score, "section_updated_at.lead_score": now, "updated_at": now}
+        if doc.get("api_view_version") == LEAD_VIEW_VERSION:
+            # Patch the stored view in place; older views are rebuilt from lead_score on their next read.
+            fields["api_view.score"] = {key: score[key] for key in ("reply_probability", "quality_score", "reasoning", "factors")}
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+    return updates
+
+async def rescore_leads(query: Dict[str, Any], batch_size: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Re-score every lead matching ``query`` with the local scorer, one bulk write per ``batch_size`` leads."""
+    batch_size = batch_size or settings.LEAD_RESCORE_BATCH_SIZE
+    scorer = get_scorer()
+    collection = get_leads_collection()
+    started = time.perf_counter()
+    matched = updated = 0
+    quality_total = 0.0
+    batch: List[Dict[str, Any]] = []
+
+    async def flush() -> None:
+        nonlocal matched, updated, quality_total, batch
+        docs, batch = batch, []
+        scores = scorer.score(docs)
+        matched += len(docs)
+        quality_total += sum(score["quality_score"] for score in scores)
+        if not dry_run:
+            result = await collection.bulk_write(rescore_updates(docs, scores, datetime.utcnow()), ordered=False)
+            updated += result.modified_count
+
+    async for doc in collection.find(query, RESCORE_PROJECTION).batch_size(batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    return {
+        "matched": matched,
+        "updated": updated,
+        "mean_quality_score": round(quality_total / matched, 1) if matched else None,
+        "dry_run": dry_run,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
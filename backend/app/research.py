@@ -0,0 +1,179 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.config import get_settings
+from app.models.database import get_leads_collection
+from app.models.schemas import LeadInput
+from app.agent.core import LeadIntelligenceAgent, STAGE_OUTPUTS
+from app.agent.http import get_http_client
+from app.agent.llm import llm_priority
+from app.singleflight import SingleFlight
+from app.views import attach_lead_view
+from app.content import externalize_lead_content
+from app.metrics import RESEARCH_SECONDS
+from app.dedupe import duplicate_index
+
+settings = get_settings()
+
+# Stored lead field -> AgentContext attribute the agent fills it from.
+LEAD_SECTIONS = {
+    "company_intelligence": "scraped_data",
+    "decision_makers": "decision_makers",
+    "tech_stack": "tech_stack",
+    "pain_hypothesis": "pain_hypothesis",
+    "generated_email": "generated_email",
+    "lead_score": "lead_score",
+}
+
+# Agent stage -> stored lead field it produces.
+STAGE_SECTIONS = {stage: section for section, attr in LEAD_SECTIONS.items() for stage, output in STAGE_OUTPUTS.items() if output == attr}
+
+class ResearchFailed(Exception):
+    pass
+
+# Concurrent requests for the same domain and persona share one agent run, as long as they would have started the same
+# run: same cache mode, reasoning mode and LLM priority (an interactive caller must not wait behind a batch-priority run).
+inflight = SingleFlight(settings.RESEARCH_MAX_INFLIGHT)
+
+class LeadWriter:
+    """Group-commits new lead documents with insert_many.
+
+    ``add`` returns only once its document is stored, so no caller is handed a lead Mongo does not have yet.
+    Documents added while an insert is in flight go out together in the next one, up to ``batch_size`` per call.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._writing: Optional[asyncio.Task] = None
+
+    async def add(self, doc: Dict[str, Any]) -> ObjectId:
+        doc["_id"] = ObjectId()
+        saved = asyncio.get_running_loop().create_future()
+        self._pending.append((doc, saved))
+        if self._writing is None or self._writing.done():
+            self._writing = asyncio.ensure_future(self._write())
+        await saved
+        return doc["_id"]
+
+    async def _write(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending[: self.batch_size], self._pending[self.batch_size:]
+            try:
+                await get_leads_collection().insert_many([doc for doc, _ in batch], ordered=False)
+            except Exception as e:
+                for _, saved in batch:
+                    if not saved.done():
+                        saved.set_exception(e)
+            else:
+                for _, saved in batch:
+                    if not saved.done():
+                        saved.set_result(None)
+
+    async def flush(self) -> None:
+        """Wait for documents already added to be written."""
+        while self._writing is not None and not self._writing.done():
+            await asyncio.shield(self._writing)
+
+def build_lead_doc(result: Dict[str, Any]) -> Dict[str, Any]:
+    data = result["data"]
+    now = datetime.utcnow()
+    return attach_lead_view({
+        "company_name": result["company_name"] or result["company_domain"],
+        "company_domain": result["company_domain"] or "",
+        "icp_persona": result["icp_persona"],
+        "company_intelligence": data.get("company_intelligence", {}),
+        "decision_makers": data.get("decision_makers", []),
+        "tech_stack": data.get("tech_stack", []),
+        "pain_hypothesis": data.get("pain_hypothesis", ""),
+        "generated_email": data.get("generated_email", {}),
+        "lead_score": data.get("lead_score", {}),
+        "reasoning_chain": result.get("reasoning_chain", []),
+        "steps_executed": result.get("steps_executed", 0),
+        "fallbacks": result.get("fallbacks", []),
+        "timings": result.get("timings", {}),
+        "section_updated_at": {section: now for section in LEAD_SECTIONS},
+        "status": "new",
+        "created_at": now,
+        "updated_at": now,
+    })
+
+def stale_sections(doc: Dict[str, Any], now: Optional[datetime] = None) -> List[str]:
+    now = now or datetime.utcnow()
+    updated = doc.get("section_updated_at") or {}
+    max_ages = settings.research_section_max_age
+    stale = []
+    for section in LEAD_SECTIONS:
+        stamp = updated.get(section) or doc.get("updated_at") or doc.get("created_at")
+        max_age = max_ages.get(section, settings.RESEARCH_CACHE_MAX_AGE_SECONDS)
+        # An empty section (no tech detected, no contacts found) is a stored result, not a missing one.
+        if section not in doc or stamp is None or (now - stamp).total_seconds() > max_age:
+            stale.append(section)
+    return stale
+
+async def find_cached_lead(company_domain: str, icp_persona: str) -> Optional[Dict[str, Any]]:
+    return await get_leads_collection().find_one(
+        {"company_domain": company_domain, "icp_persona": icp_persona},
+        sort=[("created_at", -1)],
+    )
+
+async def research(input_data: LeadInput, writer: Optional[LeadWriter] = None,
+                   on_stage: Optional[Callable[[str, Any], None]] = None) -> Tuple[Dict[str, Any], str]:
+    """Return the stored lead for ``input_data`` and how it was produced: cache_hit, partial_refresh or full_run.
+
+    New leads go through ``writer`` when one is given, otherwise they are inserted on their own; either way the lead
+    is stored before it is returned or indexed for duplicate detection.
+    ``on_stage`` receives agent stage results as they complete; callers that join an in-flight run get none.
+    """
+    agent = LeadIntelligenceAgent(http_client=get_http_client(), reasoning_mode=input_data.reasoning_mode)
+    if not input_data.company_name and not input_data.company_domain:
+        raise ResearchFailed("company_name or company_domain is required")
+    company_domain = agent.resolve_domain(input_data.company_name, input_data.company_domain)
+    started = time.perf_counter()
+    lead_doc, source = await inflight.do(
+        (company_domain, input_data.icp_persona, input_data.cache_mode, agent.reasoning_mode, llm_priority.get()),
+        lambda: _research(agent, input_data, company_domain, writer, on_stage),
+    )
+    RESEARCH_SECONDS.observe(time.perf_counter() - started, source=source)
+    if source != "cache_hit":
+        duplicate_index.add(lead_doc)
+    # Waiters share one document; give each caller its own copy to serialize.
+    return dict(lead_doc), source
+
+async def _research(agent: LeadIntelligenceAgent, input_data: LeadInput, company_domain: str, writer: Optional[LeadWriter],
+                    on_stage: Optional[Callable[[str, Any], None]] = None) -> Tuple[Dict[str, Any], str]:
+    cached = None
+    if input_data.cache_mode == "prefer":
+        cached = await find_cached_lead(company_domain, input_data.icp_persona)
+    stale = stale_sections(cached) if cached else list(LEAD_SECTIONS)
+    if cached and not stale:
+        return cached, "cache_hit"
+
+    partial = cached is not None and len(stale) < len(LEAD_SECTIONS)
+    seed = {attr: cached[section] for section, attr in LEAD_SECTIONS.items() if section not in stale} if partial else None
+    result = await agent.run(input_data.company_name, input_data.company_domain, input_data.icp_persona, seed=seed, on_stage=on_stage)
+    if result.get("status") != "complete":
+        raise ResearchFailed(result.get("error", "Agent failed"))
+    lead_doc = await externalize_lead_content(build_lead_doc(result))
+
+    collection = get_leads_collection()
+    if partial:
+        now = lead_doc["updated_at"]
+        updates = {section: lead_doc[section] for section in stale}
+        updates.update({f"section_updated_at.{section}": now for section in stale})
+        updates.update({"reasoning_chain_ref": lead_doc.get("reasoning_chain_ref"), "steps_executed": lead_doc["steps_executed"], "fallbacks": lead_doc["fallbacks"], "timings": lead_doc["timings"], "updated_at": now})
+        merged = attach_lead_view({**cached, **{section: lead_doc[section] for section in stale}})
+        updates.update({"api_view": merged["api_view"], "api_view_version": merged["api_view_version"]})
+        refreshed = await collection.find_one_and_update({"_id": cached["_id"]}, {"$set": updates, "$unset": {"reasoning_chain": ""}}, return_document=ReturnDocument.AFTER)
+        if refreshed:
+            return refreshed, "partial_refresh"
+    if writer is not None:
+        await writer.add(lead_doc)
+    else:
+        insert_result = await collection.insert_one(lead_doc)
+        lead_doc["_id"] = insert_result.inserted_id
+    return lead_doc, "full_run"
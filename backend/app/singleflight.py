@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlightFull(Exception):
+    pass
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight task.
+
+    Every caller awaits the same task, so they all get its result or its exception.
+    The task is shielded, so a caller that disconnects does not cancel the work for the rest.
+    """
+
+    def __init__(self, max_inflight: int):
+        self.max_inflight = max_inflight
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            if len(self._calls) >= self.max_inflight:
+                raise SingleFlightFull(f"{len(self._calls)} requests already in flight")
+            call = self._calls[key] = asyncio.ensure_future(fn())
+            call.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Mark the exception retrieved even if every caller went away.
+            call.exception()
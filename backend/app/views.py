@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Any, Dict
+from bson import ObjectId
+
+from app.models.database import serialize_lead
+from app.models.schemas import LeadResponse, LeadAnalysis, DecisionMaker, TechStackItem, GeneratedEmail, LeadScore
+
+# Bump whenever format_lead_response changes what it produces; stored views from older versions are rebuilt on read.
+LEAD_VIEW_VERSION = 1
+
+# Fields a LeadSummary is built from; list pages never load scraped text or reasoning.
+LEAD_SUMMARY_PROJECTION = {
+    "company_name": 1, "company_domain": 1, "icp_persona": 1, "status": 1, "created_at": 1,
+    "lead_score.reply_probability": 1, "lead_score.quality_score": 1,
+}
+LEAD_VIEW_PROJECTION = {"api_view": 1, "api_view_version": 1}
+# Inline text on older leads, content-store references on newer ones.
+LEAD_CONTENT_PROJECTION = {
+    "company_intelligence.raw_content.full_text": 1, "company_intelligence.raw_content.full_text_ref": 1,
+    "reasoning_chain": 1, "reasoning_chain_ref": 1,
+}
+
+def build_lead_view(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """LeadResponse fields for a stored lead, minus the id; computed once when the lead is written."""
+    return format_lead_response(dict(doc)).model_dump(exclude={"id", "research_source"})
+
+def attach_lead_view(doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc["api_view"] = build_lead_view(doc)
+    doc["api_view_version"] = LEAD_VIEW_VERSION
+    return doc
+
+def has_current_view(doc: Dict[str, Any]) -> bool:
+    return doc.get("api_view_version") == LEAD_VIEW_VERSION and doc.get("api_view") is not None
+
+async def refresh_lead_view(collection, lead_id: ObjectId) -> Dict[str, Any] | None:
+    """Rebuild and store the view of a lead written before LEAD_VIEW_VERSION (lazy migration)."""
+    doc = await collection.find_one({"_id": lead_id})
+    if doc is None:
+        return None
+    attach_lead_view(doc)
+    await collection.update_one({"_id": lead_id}, {"$set": {"api_view": doc["api_view"], "api_view_version": LEAD_VIEW_VERSION}})
+    return doc
+
+def lead_payload(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """LeadResponse-shaped dict straight from the stored view, ready for ORJSONResponse."""
+    return {"id": str(doc["_id"]), **doc["api_view"]}
+
+def format_lead_summary(doc: dict) -> Dict[str, Any]:
+    """LeadSummary-shaped dict from a LEAD_SUMMARY_PROJECTION document."""
+    lead_score = doc.get("lead_score") or {}
+    return {
+        "id": str(doc["_id"]),
+        "company_name": doc.get("company_name", ""),
+        "company_domain": doc.get("company_domain", ""),
+        "icp_persona": doc.get("icp_persona", ""),
+        "score": {
+            "reply_probability": float(lead_score.get("reply_probability", 0.0)),
+            "quality_score": float(lead_score.get("quality_score", 0.0)),
+        },
+        "status": doc.get("status", "new"),
+        "created_at": doc.get("created_at", datetime.utcnow()),
+    }
+
+def format_lead_response(lead: dict) -> LeadResponse:
+    doc = serialize_lead(lead)
+    company_intel = doc.get("company_intelligence", {}) or {}
+    raw_content = company_intel.get("raw_content", {}) or {}
+    decision_makers = doc.get("decision_makers", []) or []
+    tech_stack = doc.get("tech_stack", []) or []
+    lead_score = doc.get("lead_score", {}) or {}
+    generated_email = doc.get("generated_email", {}) or {}
+    personalization_elements = generated_email.get("personalization_elements", [])
+    if isinstance(personalization_elements, dict):
+        personalization_elements = [f"{k}: {v}" for k, v in personalization_elements.items()]
+    elif isinstance(personalization_elements, str):
+        personalization_elements = [personalization_elements]
+    elif not isinstance(personalization_elements, list):
+        personalization_elements = []
+    else:
+        personalization_elements = [str(v) for v in personalization_elements]
+
+    company_summary = raw_content.get("description") or raw_content.get("title") or ""
+    key_insights = []
+    if raw_content.get("title"):
+        key_insights.append(f"Site title: {raw_content.get('title')}")
+    if company_intel.get("source_url"):
+        key_insights.append(f"Source: {company_intel.get('source_url')}")
+
+    return LeadResponse(
+        id=doc.get("id", ""),
+        company_name=doc.get("company_name", ""),
+        company_domain=doc.get("company_domain", ""),
+        icp_persona=doc.get("icp_persona", ""),
+        analysis=LeadAnalysis(
+            company_summary=company_summary,
+            key_insights=key_insights,
+            pain_points=[doc.get("pain_hypothesis")] if doc.get("pain_hypothesis") else [],
+            opportunities=[]
+        ),
+        decision_makers=[
+            DecisionMaker(
+                name=d.get("name", "Unknown"),
+                title=d.get("title", "Executive"),
+                linkedin_url=d.get("linkedin_url"),
+                email=d.get("email"),
+                relevance_score=float(d.get("relevance_score", 0.5))
+            )
+            for d in decision_makers
+        ],
+        tech_stack=[
+            TechStackItem(
+                technology=t.get("technology") or t.get("tech") or "Unknown",
+                category=t.get("category") or "Other",
+                confidence=float(t.get("confidence", 0.5)),
+                evidence=[f"{e.get('type')}: {e.get('pattern')}" for e in t.get("evidence", [])]
+            )
+            for t in tech_stack
+        ],
+        pain_hypothesis=doc.get("pain_hypothesis", ""),
+        generated_email=GeneratedEmail(
+            subject=generated_email.get("subject", ""),
+            body=generated_email.get("body", ""),
+            personalization_elements=personalization_elements,
+            cta=generated_email.get("cta", "")
+        ),
+        score=LeadScore(
+            reply_probability=float(lead_score.get("reply_probability", 0.0)),
+            quality_score=float(lead_score.get("quality_score", 0.0)),
+            reasoning=lead_score.get("reasoning", ""),
+            factors={k: float(v) for k, v in (lead_score.get("factors") or {}).items()}
+        ),
+        status=doc.get("status", "new"),
+        created_at=doc.get("created_at", datetime.utcnow())
+    )
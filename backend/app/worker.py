@@ -0,0 +1,164 @@
+"""Research worker: claims jobs from research_jobs and runs the agent outside the API process.
+
+Run from backend/: python -m app.worker [--concurrency N] [--processes P] [--metrics-port PORT]
+Start as many workers, on as many hosts, as needed; they coordinate through the job leases in Mongo.
+Stage, LLM, fetch and fallback metrics are recorded where the agent runs; with --metrics-port each process serves
+its own at http://host:PORT+i/metrics (i = process index), since /api/metrics only covers the API process.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import uuid
+from typing import Any, Dict, Optional, Set
+
+from app.config import get_settings
+from app.models.database import init_db, close_db
+from app.models.schemas import LeadInput
+from app.agent.http import init_http_client, close_http_client
+from app.agent.llm import llm_priority
+from app.agent.techdetect import get_engine
+from app.jobs import JobQueue, job_queue
+from app.metrics import start_metrics_server
+from app.research import research
+
+settings = get_settings()
+_logger = logging.getLogger("app.worker")
+
+class ResearchWorker:
+    def __init__(self, queue: JobQueue, concurrency: int, worker_id: str):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.worker_id = worker_id
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        _logger.info("Worker %s started with concurrency %d", self.worker_id, self.concurrency)
+        while not stop.is_set():
+            await slots.acquire()
+            try:
+                job = await self.queue.claim(self.worker_id)
+            except Exception:
+                _logger.exception("Claiming a job failed")
+                job = None
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(stop.wait(), settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: (self._tasks.discard(done), slots.release()))
+        await self._drain()
+
+    async def _drain(self) -> None:
+        if not self._tasks:
+            return
+        _logger.info("Waiting up to %.0fs for %d running jobs", settings.WORKER_SHUTDOWN_GRACE_SECONDS, len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=settings.WORKER_SHUTDOWN_GRACE_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        if job["attempts"] > job.get("max_attempts", self.queue.max_attempts):
+            # Reclaimed after its lease expired on the last attempt.
+            await self.queue.fail(job, job.get("last_error") or "Lease expired")
+            return
+        llm_priority.set(job.get("priority", llm_priority.get()))
+        pending_writes: Set[asyncio.Task] = set()
+
+        def on_stage(stage: str, output: Any) -> None:
+            write = asyncio.ensure_future(self.queue.record_stage(job, stage, output))
+            pending_writes.add(write)
+            write.add_done_callback(pending_writes.discard)
+
+        work = asyncio.ensure_future(research(LeadInput(**job["input"]), on_stage=on_stage))
+        heartbeat = asyncio.create_task(self._heartbeat(job, work))
+        try:
+            lead_doc, source = await work
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result() is False:
+                _logger.warning("Lost the lease on job %s; another worker has it", job["_id"])
+                return
+            # Shutting down: give the job back for another worker.
+            await self.queue.release(job)
+            raise
+        except Exception as e:
+            await asyncio.gather(*pending_writes, return_exceptions=True)
+            _logger.warning("Job %s attempt %d failed: %s", job["_id"], job["attempts"], e)
+            await self.queue.fail(job, str(e) or e.__class__.__name__)
+            return
+        finally:
+            heartbeat.cancel()
+        await asyncio.gather(*pending_writes, return_exceptions=True)
+        if not await self.queue.complete(job, lead_doc["_id"], source):
+            _logger.warning("Job %s finished after its lease was taken over", job["_id"])
+
+    async def _heartbeat(self, job: Dict[str, Any], work: asyncio.Future) -> bool:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                alive = await self.queue.heartbeat(job)
+            except Exception:
+                _logger.exception("Heartbeat for job %s failed", job["_id"])
+                continue
+            if not alive:
+                work.cancel()
+                return False
+
+async def serve(concurrency: int, metrics_port: Optional[int] = None) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    metrics_server = await start_metrics_server(settings.WORKER_METRICS_HOST, metrics_port) if metrics_port else None
+    if metrics_server is not None:
+        _logger.info("Serving metrics on %s:%d/metrics", settings.WORKER_METRICS_HOST, metrics_port)
+    await init_db()
+    await init_http_client()
+    get_engine()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    try:
+        await ResearchWorker(job_queue, concurrency, worker_id).run(stop)
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        await close_http_client()
+        await close_db()
+
+def run_process(concurrency: int, metrics_port: Optional[int] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    asyncio.run(serve(concurrency, metrics_port))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY, help="jobs run at once per process")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to start on this host")
+    parser.add_argument("--metrics-port", type=int, default=settings.WORKER_METRICS_PORT,
+                        help="serve Prometheus metrics on this port, the next ones for further processes; 0 disables")
+    args = parser.parse_args()
+    if args.processes <= 1:
+        run_process(args.concurrency, args.metrics_port)
+        return
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_process, args=(args.concurrency, args.metrics_port + i if args.metrics_port else None), name=f"worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Children get SIGINT/SIGTERM through the process group and drain on their own.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes if p.is_alive()])
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Latency of the in-memory duplicate index: indexing stored leads, the per-request lookup run before an agent run,
+and the clustering behind GET /api/leads/duplicates (with how long it blocks the event loop). Every tenth lead gets an alias stored under another name and
+domain ("Company 7, Inc." / company7inc.com); Mongo is left out.
+
+Run from backend/: python -m benchmarks.duplicate_index [--leads N] [--lookups N] [--gc-freeze]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import statistics
+import time
+from typing import List, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bson import ObjectId
+from app.config import get_settings
+from app.dedupe import DuplicateIndex
+from benchmarks.lead_listing import make_lead
+
+async def cluster_with_lag(index: DuplicateIndex) -> Tuple[List, float]:
+    """Cluster while a ticker measures the longest gap between its 5 ms sleeps, i.e. how long the loop was blocked."""
+    stall, done = 0.0, False
+
+    async def ticker() -> None:
+        nonlocal stall
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stall = max(stall, time.perf_counter() - before - 0.005)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    clusters = await index.clusters()
+    done = True
+    await tick
+    return clusters, stall
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--gc-freeze", action="store_true", help="freeze the collector after indexing")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    leads = [make_lead(i) for i in range(args.leads)]
+    leads += [{**make_lead(i), "_id": ObjectId(), "company_name": f"Company {i}, Inc.", "company_domain": f"company{i}inc.com"} for i in range(0, args.leads, 10)]
+    index = DuplicateIndex(settings.DEDUPE_NUM_PERM, settings.DEDUPE_BANDS, settings.DEDUPE_THRESHOLD, settings.DEDUPE_SITE_THRESHOLD)
+    index.enabled = True
+
+    started = time.perf_counter()
+    for doc in leads:
+        index.add(doc)
+    seconds = time.perf_counter() - started
+    if args.gc_freeze:
+        gc.freeze()  # as lifespan does with GC_FREEZE_AFTER_STARTUP
+    print(f"index {len(leads)} leads: {seconds * 1000:.0f} ms ({len(leads) / seconds:.0f} leads/s)")
+
+    persona = leads[0]["icp_persona"]
+    queries = [(f"Company {i} Corp", None) for i in range(0, args.leads, max(1, args.leads // args.lookups))]
+    queries += [(f"Unrelated Startup {i}", None) for i in range(len(queries))]
+    samples, found = [], 0
+    for name, domain in queries:
+        started = time.perf_counter()
+        found += bool(index.find(name, domain, persona))
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    print(f"find x{len(samples)}: p50 {statistics.median(samples) * 1e6:.0f} us, p99 {samples[int(len(samples) * 0.99)] * 1e6:.0f} us, {found} with matches")
+
+    started = time.perf_counter()
+    clusters, stall = asyncio.run(cluster_with_lag(index))
+    print(f"clusters: {(time.perf_counter() - started) * 1000:.0f} ms, {len(clusters)} clusters of {sum(map(len, clusters))} leads, "
+          f"longest event-loop stall {stall * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
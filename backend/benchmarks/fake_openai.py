@@ -0,0 +1,120 @@
+"""OpenAI-compatible stand-in for load tests: POST /v1/chat/completions with canned answers and configurable latency.
+
+Prompts are classified by the agent's own wording (think, pain, linkedin, email, score, generation, summary) and
+answered with fixed JSON or text of realistic length; usage reports roughly four characters per token.
+
+Run from backend/: python -m benchmarks.fake_openai [--port 9101] [--latency 0.4] [--latency-per-type email=1.2,score=0.6]
+then point the app at it with OPENAI_BASE_URL=http://127.0.0.1:9101/v1
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+
+# Checked in order; the first marker found in the last user message decides the type.
+PROMPT_TYPES = (
+    ("generation", "Return JSON with: pain_hypothesis"),
+    ("think", "What next?"),
+    ("summary", "Summarize in 3 sentences"),
+    ("pain", "pain hypothesis"),
+    ("linkedin", "LinkedIn searches"),
+    ("email", "cold email"),
+    ("score", "Score lead"),
+)
+
+EMAIL = {
+    "subject": "Scaling releases without scaling headcount",
+    "body": "Hi there,\n\n" + "Teams like yours usually hit a wall once the platform has to serve several product squads at once. " * 4
+            + "\n\nWorth a 15-minute call next week?\n\nBest,\nAlex",
+    "personalization_elements": ["recent hiring push", "React and Node.js stack", "Series B growth"],
+    "cta": "15-minute call next week",
+}
+SCORE = {
+    "reply_probability": 0.34,
+    "quality_score": 72,
+    "reasoning": "Strong persona fit and a modern stack; no clear buying trigger yet. " * 2,
+    "factors": {"persona_fit": 0.8, "tech_fit": 0.7, "timing": 0.4},
+}
+PAIN = ("Shipping velocity is dropping as the engineering team grows past the point where one platform team can support "
+        "every squad. Release coordination and flaky environments are eating into roadmap time.")
+CANNED = {
+    "think": "Company context gathered so far is partial; next, collect decision makers and the tech stack before drafting outreach.",
+    "summary": "The company sells a B2B SaaS platform on a modern JavaScript stack. The engineering org is growing quickly. "
+               "Outreach should lead with release velocity.",
+    "pain": PAIN,
+    "linkedin": json.dumps({"searches": [
+        {"title": "VP of Engineering", "seniority": "vp"},
+        {"title": "Head of Platform", "seniority": "director"},
+        {"title": "Chief Technology Officer", "seniority": "c-suite"},
+    ]}),
+    "email": json.dumps(EMAIL),
+    "score": json.dumps(SCORE),
+    "generation": json.dumps({"pain_hypothesis": PAIN, "email": EMAIL, "score": SCORE}),
+    "other": "OK",
+}
+
+def classify(prompt: str) -> str:
+    for prompt_type, marker in PROMPT_TYPES:
+        if marker in prompt:
+            return prompt_type
+    return "other"
+
+def parse_latencies(raw: str) -> Dict[str, float]:
+    latencies = {}
+    for item in raw.split(","):
+        if "=" in item:
+            prompt_type, seconds = item.split("=", 1)
+            latencies[prompt_type.strip()] = float(seconds)
+    return latencies
+
+def create_app(latency: float = 0.4, jitter: float = 0.25, latencies: Optional[Dict[str, float]] = None) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = {}
+    ids = itertools.count()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or [{}]
+        prompt = str(messages[-1].get("content", ""))
+        prompt_type = classify(prompt)
+        app.state.requests[prompt_type] = app.state.requests.get(prompt_type, 0) + 1
+        mean = (latencies or {}).get(prompt_type, latency)
+        await asyncio.sleep(max(0.0, mean * random.uniform(1 - jitter, 1 + jitter)))
+        content = CANNED[prompt_type]
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4 + 4 * len(messages)
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-bench{next(ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.requests
+
+    return app
+
+def main() -> None:
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9101)
+    parser.add_argument("--latency", type=float, default=0.4, help="mean seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.25, help="latency varies uniformly by +/- this fraction")
+    parser.add_argument("--latency-per-type", default="", help="overrides, e.g. email=1.2,score=0.6")
+    args = parser.parse_args()
+    app = create_app(args.latency, args.jitter, parse_latencies(args.latency_per_type))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
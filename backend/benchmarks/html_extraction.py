@@ -0,0 +1,55 @@
+"""Scraper extraction time and peak memory: BeautifulSoup tree vs the streaming extractor backends.
+
+Run from backend/: python -m benchmarks.html_extraction [--repeat N]
+"""
+import argparse
+import os
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from bs4 import BeautifulSoup
+from app.agent.extract import extract_content
+from benchmarks.tech_detection import make_page, timeit
+
+def legacy_extract(body: bytes) -> dict:
+    # What WebScraperTool did before the streaming extractor.
+    soup = BeautifulSoup(body.decode("utf-8", "replace"), "html.parser")
+    content = {}
+    meta = soup.find("meta", {"name": "description"})
+    if meta:
+        content["description"] = meta.get("content", "")
+    title = soup.find("title")
+    if title:
+        content["title"] = title.get_text()
+    content["full_text"] = " ".join(list(soup.stripped_strings)[:500])
+    return content
+
+def peak_mb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractors = {
+        "bs4": legacy_extract,
+        "html.parser": lambda body: extract_content(body, backend="html.parser"),
+        "lxml": lambda body: extract_content(body, backend="lxml"),
+    }
+    print(f"{'page':>8} {'extractor':>12} {'ms':>10} {'peak MB':>8} {'same':>5}")
+    for size in (100_000, 1_000_000, 5_000_000):
+        page = make_page(size)
+        expected = legacy_extract(page)
+        for name, fn in extractors.items():
+            elapsed = timeit(lambda: fn(page), args.repeat)
+            same = fn(page) == expected
+            print(f"{len(page) / 1e6:>6.1f}MB {name:>12} {elapsed * 1000:>10.2f} {peak_mb(lambda: fn(page)):>8.1f} {str(same):>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""GET /api/leads and GET /api/leads/{id} serving cost, before and after precomputed views, with 50-lead pages.
+
+"before" is the old path: whole documents, format_lead_response and Pydantic validation per lead, then
+FastAPI's jsonable_encoder + json.dumps. "after" is the current path: projected summaries or the stored
+api_view, serialized with orjson. Mongo is left out; BSON bytes per page stand in for what it would send.
+
+Run from backend/: python -m benchmarks.lead_listing [--repeat N]
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import bson
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from app.models.schemas import LeadResponse
+from app.views import LEAD_SUMMARY_PROJECTION, attach_lead_view, format_lead_response, format_lead_summary, lead_payload
+from benchmarks.tech_detection import timeit
+
+PAGE_SIZE = 50
+
+def make_lead(i: int) -> dict:
+    rng = random.Random(i)
+    doc = {
+        "_id": ObjectId(),
+        "company_name": f"Company {i}",
+        "company_domain": f"company{i}.com",
+        "icp_persona": "VP of Engineering at Series B SaaS",
+        "company_intelligence": {
+            "raw_content": {"title": f"Company {i}", "description": "We help teams ship faster. " * 4, "full_text": "Lorem ipsum dolor sit amet. " * 700},
+            "domain": f"company{i}.com", "source_url": f"https://company{i}.com",
+        },
+        "decision_makers": [{"name": f"Contact {n}", "title": "VP Engineering", "seniority": "vp", "linkedin_url": "https://www.linkedin.com/search", "relevance_score": 0.9 - n * 0.15} for n in range(3)],
+        "tech_stack": [{"tech": f"Tech {n}", "category": "Framework", "confidence": rng.random(), "evidence": [{"type": "html", "pattern": "data-x", "match": "data-x"}]} for n in range(12)],
+        "pain_hypothesis": "Scaling the platform team is slowing releases. " * 2,
+        "generated_email": {"subject": "Quick question", "body": "Hi there,\n\n" + "Body text. " * 60, "personalization_elements": {"growth": "hiring", "stack": "React"}, "cta": "15-min call?"},
+        "lead_score": {"reply_probability": rng.random(), "quality_score": rng.randint(0, 100), "reasoning": "Good fit. " * 10, "factors": {"fit": 0.8, "timing": 0.6}},
+        "reasoning_chain": ["Step reasoning. " * 20 for _ in range(6)],
+        "steps_executed": 6,
+        "status": "new",
+        "created_at": datetime(2026, 1, 1) + timedelta(minutes=i),
+    }
+    return attach_lead_view(doc)
+
+def project(doc: dict, projection: dict) -> dict:
+    out = {"_id": doc["_id"]}
+    for path in projection:
+        head, _, tail = path.partition(".")
+        if head in doc:
+            out[head] = {tail: doc[head][tail]} if tail else doc[head]
+    return out
+
+def without_view(doc: dict) -> dict:
+    return {k: v for k, v in doc.items() if k not in ("api_view", "api_view_version")}
+
+def list_before(docs: list) -> bytes:
+    leads = [format_lead_response(without_view(doc)) for doc in docs]
+    return json.dumps(jsonable_encoder({"leads": leads, "total": len(docs)})).encode()
+
+def list_after(docs: list) -> bytes:
+    return orjson.dumps({"leads": [format_lead_summary(doc) for doc in docs], "next_cursor": None, "total": None})
+
+def detail_before(doc: dict) -> bytes:
+    return json.dumps(jsonable_encoder(LeadResponse.model_validate(format_lead_response(without_view(doc))))).encode()
+
+def detail_after(doc: dict) -> bytes:
+    return orjson.dumps(lead_payload({"_id": doc["_id"], "api_view": doc["api_view"]}))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    docs = [make_lead(i) for i in range(PAGE_SIZE)]
+    full = [without_view(doc) for doc in docs]
+    projected = [project(doc, LEAD_SUMMARY_PROJECTION) for doc in docs]
+    view_only = [{"_id": doc["_id"], "api_view": doc["api_view"]} for doc in docs]
+    cases = [
+        ("list page", lambda: list_before(full), lambda: list_after(projected),
+         sum(len(bson.encode(d)) for d in full), sum(len(bson.encode(d)) for d in projected)),
+        ("lead detail", lambda: detail_before(full[0]), lambda: detail_after(docs[0]),
+         len(bson.encode(full[0])), len(bson.encode(view_only[0]))),
+    ]
+    print(f"{'endpoint':>12} {'before/s':>10} {'after/s':>10} {'speedup':>8} {'BSON before':>12} {'BSON after':>11}")
+    for name, before, after, bytes_before, bytes_after in cases:
+        before_s, after_s = timeit(before, args.repeat), timeit(after, args.repeat)
+        print(f"{name:>12} {1 / before_s:>10.0f} {1 / after_s:>10.0f} {before_s / after_s:>7.1f}x {bytes_before:>12,} {bytes_after:>11,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Throughput of the local lead scorer on stored-lead documents: feature extraction, vectorized scoring and the
+LeadScore dicts POST /api/leads/rescore writes back. Mongo is left out.
+
+Run from backend/: python -m benchmarks.lead_scoring [--leads N] [--repeat N]
+"""
+import argparse
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.agent.scoring import get_scorer
+from benchmarks.lead_listing import make_lead
+from benchmarks.tech_detection import timeit
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    leads = [make_lead(i) for i in range(args.leads)]
+    scorer = get_scorer()
+    X = scorer.features(leads)
+    print(f"{args.leads} leads, {X.shape[1]} features")
+    for label, fn in (
+        ("features", lambda: scorer.features(leads)),
+        ("score matrix", lambda: scorer.score_matrix(X)),
+        ("full score()", lambda: scorer.score(leads)),
+    ):
+        seconds = timeit(fn, args.repeat)
+        print(f"  {label:<14} {seconds * 1000:8.1f} ms  {args.leads / seconds:>10.0f} leads/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Offline load test of POST /api/leads/research: fake OpenAI, local site farm and in-memory Mongo.
+
+Starts benchmarks.fake_openai and benchmarks.site_farm on local ports, points the app at them through
+OPENAI_BASE_URL and SCRAPER_HOMEPAGE_URLS, and drives the FastAPI app in-process at --concurrency. Every
+request researches a new domain with cache_mode=refresh, so each one is a full agent run. Reports throughput,
+request latency percentiles, per-stage percentiles from the stored lead timings, tokens and bytes per run, and
+memory. Mongo is mongomock-motor (pip install mongomock-motor) unless --mongodb-uri is given; with mongomock the
+leads it stores count towards retained memory.
+
+Any app setting can be overridden through the environment as usual, e.g. LLM_REQUESTS_PER_MINUTE=100000 to take
+the rate budget out of the picture, or AGENT_GENERATION_MODE=fused to compare generation modes.
+
+Run from backend/: python -m benchmarks.research_load [--requests 200] [--concurrency 20] [--llm-latency 0.4]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+import uvicorn
+
+from benchmarks import fake_openai
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentiles(samples: List[float]) -> str:
+    if not samples:
+        return "n/a"
+    if len(samples) == 1:
+        return f"{samples[0] * 1000:8.0f} {samples[0] * 1000:8.0f} {samples[0] * 1000:8.0f}"
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return f"{cuts[49] * 1000:8.0f} {cuts[94] * 1000:8.0f} {cuts[98] * 1000:8.0f}"
+
+def configure(args: argparse.Namespace) -> None:
+    # Settings are read once at import time, so this runs before anything from app/ (or site_farm) is imported.
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.openai_port}/v1"
+    os.environ["SCRAPER_HOMEPAGE_URLS"] = f"http://127.0.0.1:{args.site_port}/{{domain}}"
+    # Every site is served from one local host; lift the per-host cap real domains would not share.
+    os.environ.setdefault("HTTP_MAX_CONNECTIONS_PER_HOST", str(max(6, args.concurrency * 2)))
+    os.environ.setdefault("HTTP_MAX_KEEPALIVE_CONNECTIONS", str(max(20, args.concurrency * 2)))
+    os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+    if args.mongodb_uri:
+        os.environ["MONGODB_URI"] = args.mongodb_uri
+        os.environ.setdefault("MONGODB_DB", "lead_intelligence_benchmark")
+
+async def open_app(args: argparse.Namespace):
+    from app.main import app
+    from app.models import database
+    from app.agent.http import init_http_client
+    from app.agent.techdetect import get_engine
+    if args.mongodb_uri:
+        await database.init_db()
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        # Stand-in for init_db(): same globals, no server.
+        database._client = AsyncMongoMockClient()
+        database._db = database._client["lead_intelligence_benchmark"]
+    await init_http_client()
+    get_engine()
+    return app, database
+
+async def close_app() -> None:
+    from app.models.database import close_db
+    from app.agent.http import close_http_client
+    await close_http_client()
+    await close_db()
+
+async def drive(client: httpx.AsyncClient, start: int, count: int, concurrency: int, persona: str) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    next_index = iter(range(start, start + count))
+
+    async def worker():
+        for i in next_index:
+            payload = {"company_name": f"Benchmark Co {i}", "company_domain": f"bench{i}.example", "icp_persona": persona, "cache_mode": "refresh"}
+            started = time.perf_counter()
+            try:
+                resp = await client.post("/api/leads/research", json=payload)
+                status, lead_id = resp.status_code, resp.json().get("id") if resp.status_code == 200 else None
+            except Exception as e:
+                status, lead_id = e.__class__.__name__, None
+            results.append({"seconds": time.perf_counter() - started, "status": status, "id": lead_id})
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+async def lead_timings(database, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from bson import ObjectId
+    ids = [ObjectId(r["id"]) for r in results if r["id"]]
+    cursor = database.get_leads_collection().find({"_id": {"$in": ids}}, {"timings": 1})
+    return [doc.get("timings") or {} async for doc in cursor]
+
+def report(results: List[Dict[str, Any]], timings: List[Dict[str, Any]], elapsed: float, concurrency: int,
+           rss_before: float, rss_after: float, traced_peak: Optional[int]) -> None:
+    ok = [r for r in results if r["status"] == 200]
+    failed: Dict[Any, int] = {}
+    for r in results:
+        if r["status"] != 200:
+            failed[r["status"]] = failed.get(r["status"], 0) + 1
+    print(f"\n{len(results)} requests at concurrency {concurrency} in {elapsed:.1f}s: {len(results) / elapsed:.2f} req/s, "
+          f"{len(ok)} ok" + (f", failed {failed}" if failed else ""))
+    print(f"\n{'ms':<22} {'p50':>8} {'p95':>8} {'p99':>8}")
+    print(f"{'request':<22} {percentiles([r['seconds'] for r in ok])}")
+    print(f"{'agent total':<22} {percentiles([t['total_seconds'] for t in timings if 'total_seconds' in t])}")
+    stages = sorted({stage for t in timings for stage in t.get("stages", {})})
+    for stage in stages:
+        print(f"{'  ' + stage:<22} {percentiles([t['stages'][stage] for t in timings if stage in t.get('stages', {})])}")
+    print(f"{'llm (sum per run)':<22} {percentiles([t['llm']['seconds'] for t in timings if 'llm' in t])}")
+    print(f"{'http (sum per run)':<22} {percentiles([t['http']['seconds'] for t in timings if 'http' in t])}")
+    if timings:
+        runs = len(timings)
+        calls = sum(t.get("llm", {}).get("calls", 0) for t in timings) / runs
+        prompt = sum(t.get("llm", {}).get("prompt_tokens", 0) for t in timings) / runs
+        completion = sum(t.get("llm", {}).get("completion_tokens", 0) for t in timings) / runs
+        fetched = sum(t.get("http", {}).get("bytes", 0) for t in timings) / runs
+        print(f"\nper run: {calls:.1f} LLM calls, {prompt:.0f} prompt + {completion:.0f} completion tokens, {fetched / 1024:.0f} KB fetched")
+    print(f"memory: RSS {rss_before:.0f} -> {rss_after:.0f} MB ({(rss_after - rss_before) * 1000 / max(1, len(results)):.1f} KB retained per run)")
+    if traced_peak is not None:
+        print(f"        traced peak {traced_peak / 1e6:.1f} MB, {traced_peak / 1e6 / concurrency:.2f} MB per concurrent run")
+
+async def run(args: argparse.Namespace) -> None:
+    configure(args)
+    from benchmarks import site_farm
+    openai_app = fake_openai.create_app(args.llm_latency, args.llm_jitter, fake_openai.parse_latencies(args.llm_latency_per_type))
+    farm_app = site_farm.create_app(args.median_kb, args.site_latency, recorded=site_farm.load_recorded(args.pages_dir))
+    servers = [serve_in_thread(openai_app, args.openai_port), serve_in_thread(farm_app, args.site_port)]
+    app, database = await open_app(args)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None) as client:
+            if args.warmup:
+                await drive(client, 0, args.warmup, min(args.warmup, args.concurrency), args.persona)
+            gc.collect()
+            rss_before = rss_mb()
+            if args.trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            results = await drive(client, args.warmup, args.requests, args.concurrency, args.persona)
+            elapsed = time.perf_counter() - started
+            traced_peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+            tracemalloc.stop()
+            gc.collect()
+            rss_after = rss_mb()
+        report(results, await lead_timings(database, results), elapsed, args.concurrency, rss_before, rss_after, traced_peak)
+        print(f"fake OpenAI requests by type: {openai_app.state.requests}")
+    finally:
+        await close_app()
+        for server in servers:
+            server.should_exit = True
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--persona", default="VP of Engineering at Series B SaaS")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="mean seconds per fake completion")
+    parser.add_argument("--llm-jitter", type=float, default=0.25)
+    parser.add_argument("--llm-latency-per-type", default="", help="e.g. email=1.2,score=0.6")
+    parser.add_argument("--site-latency", type=float, default=0.15, help="mean seconds per homepage")
+    parser.add_argument("--median-kb", type=float, default=70.0, help="median generated homepage size")
+    parser.add_argument("--pages-dir", help="serve recorded *.html homepages instead of generated ones")
+    parser.add_argument("--openai-port", type=int, default=9101)
+    parser.add_argument("--site-port", type=int, default=9102)
+    parser.add_argument("--mongodb-uri", help="use a real MongoDB instead of mongomock-motor")
+    parser.add_argument("--trace-memory", action="store_true", help="track allocations with tracemalloc (slower)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
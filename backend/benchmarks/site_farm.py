@@ -0,0 +1,83 @@
+"""Local stand-in for company websites: GET /{domain} serves a homepage for any domain.
+
+Pages come from --pages-dir (recorded *.html files, picked per domain by hash) or, without one, are generated
+from benchmarks.tech_detection.make_page at log-normally distributed sizes around --median-kb, clipped to
+8 KB..1.5 MB, like real homepages. The same domain always gets the same page.
+
+Run from backend/: python -m benchmarks.site_farm [--port 9102] [--pages-dir DIR] [--latency 0.15]
+then point the scraper at it with SCRAPER_HOMEPAGE_URLS=http://127.0.0.1:9102/{domain}
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from benchmarks.tech_detection import make_page
+
+MIN_BYTES = 8 * 1024
+MAX_BYTES = 1536 * 1024
+HEADERS = {"server": "cloudflare", "x-powered-by": "PHP/8.2", "cache-control": "max-age=600",
+           "set-cookie": "__cf_bm=abc123; path=/; HttpOnly"}
+
+def _seed(domain: str) -> int:
+    return int.from_bytes(hashlib.blake2b(domain.encode("utf-8"), digest_size=8).digest(), "big")
+
+def page_size(domain: str, median_kb: float, sigma: float = 0.8) -> int:
+    size = random.Random(_seed(domain)).lognormvariate(math.log(median_kb * 1024), sigma)
+    return int(min(MAX_BYTES, max(MIN_BYTES, size)))
+
+def load_recorded(pages_dir: Optional[str]) -> List[bytes]:
+    if not pages_dir:
+        return []
+    pages = [path.read_bytes() for path in sorted(Path(pages_dir).glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"no .html files in {pages_dir}")
+    return pages
+
+def create_app(median_kb: float = 70.0, latency: float = 0.15, jitter: float = 0.5, recorded: Optional[List[bytes]] = None) -> FastAPI:
+    app = FastAPI()
+    app.state.served = 0
+    app.state.bytes = 0
+    generated = {}
+
+    def page_for(domain: str) -> bytes:
+        if recorded:
+            return recorded[_seed(domain) % len(recorded)]
+        size = page_size(domain, median_kb)
+        # Generated pages are shared per 16 KB size bucket so a long run does not hold one page per domain.
+        bucket = max(MIN_BYTES, size - size % (16 * 1024))
+        page = generated.get(bucket)
+        if page is None:
+            page = generated[bucket] = make_page(bucket)
+        return page
+
+    @app.get("/{domain}")
+    async def homepage(domain: str):
+        await asyncio.sleep(max(0.0, latency * random.uniform(1 - jitter, 1 + jitter)))
+        body = page_for(domain)
+        app.state.served += 1
+        app.state.bytes += len(body)
+        return Response(body, media_type="text/html; charset=utf-8", headers=HEADERS)
+
+    return app
+
+def main() -> None:
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9102)
+    parser.add_argument("--pages-dir", help="directory of recorded homepages (*.html)")
+    parser.add_argument("--median-kb", type=float, default=70.0, help="median generated page size")
+    parser.add_argument("--latency", type=float, default=0.15, help="mean seconds before the response")
+    args = parser.parse_args()
+    app = create_app(args.median_kb, args.latency, recorded=load_recorded(args.pages_dir))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Per-page scan time of the tech signature engine on large HTML.
+
+Run from backend/: python -m benchmarks.tech_detection [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.agent.techdetect import get_engine
+
+HEAD = (
+    b'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Acme</title>'
+    b'<meta name="generator" content="WordPress 6.4.2">'
+    b'<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter">'
+    b'<script async src="https://www.googletagmanager.com/gtag/js?id=G-XYZ"></script>'
+    b'<script src="https://js.hs-scripts.com/123.js"></script>'
+    b'<script src="/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"></script></head><body>'
+)
+BLOCK = (
+    b'<section class="elementor-section elementor-top-section"><div class="container mx-auto px-4">'
+    b'<h2 class="text-3xl font-bold">Scale your pipeline without scaling headcount</h2>'
+    b'<p class="lead">Our platform helps revenue teams prioritise accounts, personalise outreach and '
+    b'measure what works across every channel. Trusted by more than 2,000 companies worldwide.</p>'
+    b'<img src="/wp-content/uploads/2024/01/hero.webp" alt="" loading="lazy" width="1200" height="630">'
+    b'<a class="btn btn-primary" href="/demo">Book a demo</a><script>window.dataLayer=window.dataLayer||[];</script>'
+    b'</div></section>\n'
+)
+TAIL = b"<script>gtag('config', 'G-XYZ');</script></body></html>"
+
+def make_page(size: int) -> bytes:
+    return HEAD + BLOCK * max(1, (size - len(HEAD) - len(TAIL)) // len(BLOCK)) + TAIL
+
+def legacy_detect(body: bytes, headers: dict) -> list:
+    # The substring checks TechStackDetectorTool used before the signature engine.
+    html, server = body.decode("utf-8", "replace").lower(), headers.get("server", "").lower()
+    return [name for name, hit in (
+        ("Cloudflare", "cloudflare" in server), ("Nginx", "nginx" in server),
+        ("React", "react" in html or "data-reactroot" in html), ("Vue.js", "vue" in html), ("Google Analytics", "gtag" in html),
+    ) if hit]
+
+def timeit(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engine = get_engine()
+    print(f"compiled {engine.signature_count} signatures in {(time.perf_counter() - started) * 1000:.1f} ms")
+    headers = {"server": "cloudflare", "cf-ray": "8a1b2c3d4e5f-LHR", "x-powered-by": "PHP/8.2"}
+    cookies = ["_ga", "PHPSESSID", "hubspotutk"]
+    print(f"{'page':>8} {'engine ms':>10} {'MB/s':>8} {'legacy ms':>10} {'detected':>9}")
+    for size in (100_000, 1_000_000, 5_000_000):
+        page = make_page(size)
+        engine_s = timeit(lambda: engine.scan(page, headers, cookies), args.repeat)
+        legacy_s = timeit(lambda: legacy_detect(page, headers), args.repeat)
+        detected = len(engine.scan(page, headers, cookies))
+        print(f"{len(page) / 1e6:>6.1f}MB {engine_s * 1000:>10.2f} {len(page) / 1e6 / engine_s:>8.1f} {legacy_s * 1000:>10.2f} {detected:>9}")
+
+if __name__ == "__main__":
+    main()
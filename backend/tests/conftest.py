@@ -0,0 +1,20 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.models import database
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def db(monkeypatch):
+    """In-memory Mongo behind get_db(), fresh for every test."""
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(database, "_client", client)
+    monkeypatch.setattr(database, "_db", client["test"])
+    return client["test"]
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.jobs import JobQueue, get_jobs_collection
+from app.models.schemas import LeadInput
+
+pytestmark = pytest.mark.anyio
+
+LEAD = LeadInput(company_domain="acme.com", icp_persona="CTO")
+
+def make_queue(**overrides):
+    return JobQueue(**{"visibility_timeout": 60, "max_attempts": 3, "retry_base": 0, "retry_max": 0, **overrides})
+
+async def expire_lease(job):
+    await get_jobs_collection().update_one({"_id": job["_id"]}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+
+async def test_live_lease_is_not_claimed_twice(db):
+    queue = make_queue()
+    await queue.enqueue(LEAD)
+
+    assert await queue.claim("worker-a") is not None
+    assert await queue.claim("worker-b") is None
+
+async def test_expired_lease_is_reclaimed(db):
+    queue = make_queue()
+    job = await queue.enqueue(LEAD)
+    stale = await queue.claim("worker-a")
+    await expire_lease(stale)
+
+    reclaimed = await queue.claim("worker-b")
+
+    assert reclaimed["_id"] == job["_id"]
+    assert reclaimed["lease_owner"] == "worker-b"
+    assert reclaimed["attempts"] == 2
+    assert reclaimed["lease_expires_at"] > datetime.utcnow()
+    # The worker that lost the lease can no longer touch the job.
+    assert not await queue.heartbeat(stale)
+    assert not await queue.complete(stale, ObjectId(), "full_run")
+    assert await queue.complete(reclaimed, ObjectId(), "full_run")
+
+async def test_failure_requeues_until_max_attempts(db):
+    queue = make_queue(max_attempts=2)
+    job = await queue.enqueue(LEAD)
+
+    first = await queue.claim("worker-a")
+    assert await queue.fail(first, "boom 1")
+    assert (await queue.get(job["_id"]))["status"] == "queued"
+
+    second = await queue.claim("worker-a")
+    assert second["attempts"] == 2
+    assert await queue.fail(second, "boom 2")
+
+    failed = await queue.get(job["_id"])
+    assert failed["status"] == "failed"
+    assert failed["error"] == "boom 2"
+    assert "lease_owner" not in failed
+    assert await queue.claim("worker-a") is None
+
+async def test_retry_waits_for_backoff(db):
+    queue = make_queue(retry_base=60, retry_max=60)
+    await queue.enqueue(LEAD)
+
+    assert await queue.fail(await queue.claim("worker-a"), "boom")
+    assert await queue.claim("worker-a") is None
+
+async def test_release_does_not_use_an_attempt(db):
+    queue = make_queue(max_attempts=1)
+    job = await queue.enqueue(LEAD)
+
+    await queue.release(await queue.claim("worker-a"))
+    retried = await queue.claim("worker-b")
+
+    assert retried["_id"] == job["_id"]
+    assert retried["attempts"] == 1
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from bson import ObjectId
+
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+async def list_all(limit, max_pages=50):
+    pages, cursor = [], None
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        while len(pages) < max_pages:
+            params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/leads", params=params)
+            assert response.status_code == 200
+            body = response.json()
+            pages.append([lead["id"] for lead in body["leads"]])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+    return pages
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 7])
+async def test_pages_neither_overlap_nor_skip_on_created_at_ties(db, limit):
+    start = datetime(2026, 1, 1)
+    # Runs of leads sharing one created_at, including runs longer than a page.
+    stamps = [start] * 6 + [start + timedelta(seconds=1)] * 3 + [start + timedelta(seconds=2)] + [start + timedelta(seconds=3)] * 4
+    await db["leads"].insert_many([
+        {"_id": ObjectId(), "company_name": f"Company {i}", "company_domain": f"company{i}.com", "icp_persona": "CTO", "created_at": stamp}
+        for i, stamp in enumerate(stamps)
+    ])
+    expected = [str(doc["_id"]) async for doc in db["leads"].find().sort([("created_at", -1), ("_id", -1)])]
+
+    pages = await list_all(limit)
+
+    assert all(len(page) == limit for page in pages[:-1])
+    assert [lead_id for page in pages for lead_id in page] == expected
+
+async def test_invalid_cursor_is_rejected(db):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/leads", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight, SingleFlightFull
+
+pytestmark = pytest.mark.anyio
+
+async def test_concurrent_calls_run_once_and_share_the_result():
+    flight = SingleFlight(max_inflight=10)
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"lead": "acme"}
+
+    callers = [asyncio.create_task(flight.do("acme.com", work)) for _ in range(20)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert len(flight) == 0
+
+async def test_concurrent_calls_share_the_exception():
+    flight = SingleFlight(max_inflight=10)
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("agent failed")
+
+    results = await asyncio.gather(*(flight.do("acme.com", work) for _ in range(5)), return_exceptions=True)
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight(max_inflight=10)
+
+    async def work(key):
+        await asyncio.sleep(0.01)
+        return key
+
+    results = await asyncio.gather(*(flight.do(key, lambda key=key: work(key)) for key in ("a", "b", "a")))
+
+    assert results == ["a", "b", "a"]
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight(max_inflight=10)
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 42
+
+    leaving = asyncio.create_task(flight.do("acme.com", work))
+    staying = asyncio.create_task(flight.do("acme.com", work))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await staying == 42
+    assert leaving.cancelled()
+
+async def test_rejects_new_keys_at_capacity():
+    flight = SingleFlight(max_inflight=1)
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("a", work))
+    await asyncio.sleep(0)
+    with pytest.raises(SingleFlightFull):
+        await flight.do("b", work)
+    # A caller for the key already in flight joins it instead.
+    joined = asyncio.create_task(flight.do("a", work))
+    release.set()
+
+    assert await asyncio.gather(first, joined) == ["done", "done"]
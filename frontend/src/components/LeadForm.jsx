@@ -1,31 +1,47 @@
 import React, { useState } from 'react'
 import { motion } from 'framer-motion'
-import { Search, Building2, Target, Loader2, Sparkles } from 'lucide-react'
-import { researchLead } from '../services/api'
+import { Search, Building2, Target, Loader2, Sparkles, Copy } from 'lucide-react'
+import { researchLeadStream, DuplicateLeadError } from '../services/api'
 
-const LeadForm = ({ onSuccess }) => {
+const LeadForm = ({ onSuccess, onProgress, onError, onOpenLead }) => {
   const [formData, setFormData] = useState({ company_name: '', company_domain: '', icp_persona: '' })
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState(null)
+  const [duplicates, setDuplicates] = useState(null)
 
-  const handleSubmit = async (e) => {
+  const handleSubmit = (e) => {
     e.preventDefault()
+    research('offer')
+  }
+
+  const research = async (onDuplicate) => {
     setLoading(true)
     setError(null)
+    setDuplicates(null)
 
     try {
       if (!formData.company_name && !formData.company_domain) {
         throw new Error('Please provide company name or domain')
       }
-      const result = await researchLead({
-        company_name: formData.company_name || null,
-        company_domain: formData.company_domain || null,
-        icp_persona: formData.icp_persona,
-      })
+      const result = await researchLeadStream(
+        {
+          company_name: formData.company_name || null,
+          company_domain: formData.company_domain || null,
+          icp_persona: formData.icp_persona,
+          on_duplicate: onDuplicate,
+        },
+        { onStage: (event) => onProgress?.(event.lead, event.stage) },
+      )
       onSuccess(result)
       setFormData({ company_name: '', company_domain: '', icp_persona: '' })
     } catch (err) {
-      setError(err.response?.data?.detail || err.message)
+      if (err instanceof DuplicateLeadError) {
+        setDuplicates(err.duplicates)
+        return
+      }
+      const message = err.response?.data?.detail || err.message
+      setError(message)
+      onError?.(message)
     } finally {
       setLoading(false)
     }
@@ -85,6 +101,23 @@ const LeadForm = ({ onSuccess }) => {
           />
         </div>
 
+        {duplicates && (
+          <motion.div initial={{ opacity: 0 }} animate={{ opacity: 1 }} className="p-4 bg-sun/10 border border-sun/40 rounded-xl text-sm space-y-3">
+            <p className="font-semibold text-ink flex items-center gap-2"><Copy className="w-4 h-4" />Already researched under another name</p>
+            {duplicates.map((lead) => (
+              <div key={lead.id} className="flex items-center justify-between gap-3">
+                <span className="text-ink">{lead.company_name} <span className="text-ink/60">({lead.company_domain})</span></span>
+                <button type="button" onClick={() => { setDuplicates(null); onOpenLead?.(lead.id) }} className="px-3 py-1 rounded-lg bg-ink text-sand text-xs font-semibold">
+                  Open existing
+                </button>
+              </div>
+            ))}
+            <button type="button" onClick={() => research('research')} className="text-teal-dark text-xs font-semibold underline">
+              Research anyway
+            </button>
+          </motion.div>
+        )}
+
         {error && (
           <motion.div initial={{ opacity: 0 }} animate={{ opacity: 1 }} className="p-4 bg-clay/10 border border-clay/30 rounded-xl text-clay text-sm">
             {error}
@@ -3,13 +3,24 @@ import { motion, AnimatePresence } from 'framer-motion'
 import { Plus, History, ChevronRight, Radar, Sparkles, MailCheck, Target } from 'lucide-react'
 import LeadForm from '../components/LeadForm'
 import AnalysisResult from '../components/AnalysisResult'
-import { getLeads } from '../services/api'
+import { getLeads, getLead } from '../services/api'
 import { format } from 'date-fns'
 
+const stageLabels = {
+  web_scraper: 'Company site scraped',
+  linkedin_finder: 'Decision makers found',
+  tech_detector: 'Tech stack detected',
+  pain: 'Pain hypothesis drafted',
+  email_generator: 'Outreach email written',
+  lead_scorer: 'Lead scored',
+}
+
 const Dashboard = () => {
   const [activeView, setActiveView] = useState('form')
   const [currentResult, setCurrentResult] = useState(null)
   const [recentLeads, setRecentLeads] = useState([])
+  const [researchStage, setResearchStage] = useState(null)
+  const [researchError, setResearchError] = useState(null)
 
   useEffect(() => { fetchRecentLeads() }, [])
 
@@ -20,12 +31,35 @@ const Dashboard = () => {
     } catch (error) { console.error('Failed to fetch leads:', error) }
   }
 
+  const handleProgress = (partial, stage) => {
+    setCurrentResult(partial)
+    setResearchStage(stage)
+    setResearchError(null)
+    setActiveView('result')
+  }
+
   const handleSuccess = (result) => {
     setCurrentResult(result)
+    setResearchStage(null)
     setActiveView('result')
     fetchRecentLeads()
   }
 
+  // The list only carries summaries; the full lead is loaded when one is opened.
+  const openLead = async (id) => {
+    setResearchStage(null)
+    setResearchError(null)
+    try {
+      setCurrentResult(await getLead(id))
+      setActiveView('result')
+    } catch (error) { console.error('Failed to fetch lead:', error) }
+  }
+
+  const handleError = (message) => {
+    setResearchStage(null)
+    setResearchError(message)
+  }
+
   const avgQuality = recentLeads.length > 0
     ? Math.round(recentLeads.reduce((acc, l) => acc + (l.score?.quality_score || 0), 0) / recentLeads.length)
     : 0
@@ -46,7 +80,7 @@ const Dashboard = () => {
               </div>
             </div>
             <button
-              onClick={() => { setActiveView('form'); setCurrentResult(null) }}
+              onClick={() => { setActiveView('form'); setCurrentResult(null); setResearchStage(null); setResearchError(null) }}
               className="flex items-center gap-2 px-4 py-2 bg-ink text-sand rounded-xl text-sm font-semibold shadow-sm hover:shadow-glow transition"
             >
               <Plus className="w-4 h-4" />New Research
@@ -67,7 +101,7 @@ const Dashboard = () => {
                 {recentLeads.map((lead) => (
                   <button
                     key={lead.id}
-                    onClick={() => { setCurrentResult(lead); setActiveView('result') }}
+                    onClick={() => openLead(lead.id)}
                     className="w-full text-left p-3 rounded-xl hover:bg-sand-light transition border border-transparent hover:border-sand-dark group"
                   >
                     <div className="flex justify-between items-start">
@@ -117,13 +151,15 @@ const Dashboard = () => {
             <AnimatePresence mode="wait">
               {activeView === 'form' ? (
                 <motion.div key="form" initial={{ opacity: 0, x: -20 }} animate={{ opacity: 1, x: 0 }} exit={{ opacity: 0, x: 20 }}>
-                  <LeadForm onSuccess={handleSuccess} />
+                  <LeadForm onSuccess={handleSuccess} onProgress={handleProgress} onError={handleError} onOpenLead={openLead} />
                 </motion.div>
               ) : (
                 <motion.div key="result" initial={{ opacity: 0, x: 20 }} animate={{ opacity: 1, x: 0 }} exit={{ opacity: 0, x: -20 }}>
                   <div className="mb-4 flex items-center justify-between">
                     <button onClick={() => setActiveView('form')} className="text-sm text-ink/60 hover:text-teal-dark">Back to form</button>
-                    <span className="text-sm text-ink/50">Research complete</span>
+                    <span className={`text-sm ${researchError ? 'text-clay' : 'text-ink/50'}`}>
+                      {researchError || (researchStage ? `Researching... ${stageLabels[researchStage] || researchStage}` : 'Research complete')}
+                    </span>
                   </div>
                   <AnalysisResult data={currentResult} />
                 </motion.div>
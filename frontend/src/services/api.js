@@ -12,10 +12,70 @@ export const researchLead = async (data) => {
   return response.data
 }
 
+// A stored lead looks like the same company; `duplicates` lists them, best match first.
+export class DuplicateLeadError extends Error {
+  constructor(detail) {
+    super(detail?.message || 'This company looks like an existing lead')
+    this.duplicates = detail?.duplicates || []
+  }
+}
+
+const parseEvent = (block) => {
+  let event = 'message'
+  const data = []
+  for (const line of block.split('\n')) {
+    if (line.startsWith('event:')) event = line.slice(6).trim()
+    else if (line.startsWith('data:')) data.push(line.slice(5).trimStart())
+  }
+  return { event, data: data.length ? JSON.parse(data.join('\n')) : null }
+}
+
+// Streams /api/leads/research/stream: onStage gets each partial lead, the promise resolves with the stored lead.
+// Rejects with DuplicateLeadError when the company looks like a stored lead, unless data.on_duplicate says otherwise.
+export const researchLeadStream = async (data, { onStage, signal } = {}) => {
+  const response = await fetch(`${API_BASE_URL}/api/leads/research/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(data),
+    signal,
+  })
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}))
+    if (response.status === 409) throw new DuplicateLeadError(body.detail)
+    throw new Error(typeof body.detail === 'string' ? body.detail : `Research failed (${response.status})`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      if (block.startsWith(':')) continue
+      const { event, data: payload } = parseEvent(block)
+      if (event === 'stage') onStage?.(payload)
+      else if (event === 'lead') return payload
+      else if (event === 'duplicate') throw new DuplicateLeadError(payload)
+      else if (event === 'error') throw new Error(payload?.detail || 'Research failed')
+    }
+  }
+  throw new Error('Research stream ended before the lead was ready')
+}
+
 export const getLeads = async (params = {}) => {
   const response = await api.get('/api/leads', { params })
   return response.data
 }
 
+export const getLead = async (id) => {
+  const response = await api.get(`/api/leads/${id}`)
+  return response.data
+}
+
 export default api
  
\ No newline at end of file